@@ -1,21 +1,66 @@
+from dataclasses import dataclass
 from uuid import UUID
 
 from fastapi import Depends, Header, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..config import settings
+from ..core.cache import LRUCache, register_cache
 from ..core.database import get_db
 from ..core.security import get_current_user
 from ..models.site import Site
 from ..models.user import User
 
 
+@dataclass(frozen=True)
+class WidgetSite:
+    """Snapshot of the site fields widget endpoints need, safe to share across requests.
+
+    Snapshots are cached per process for API_KEY_CACHE_TTL, and chat contexts are keyed by their
+    content_version. Content changes made by another process (the crawler worker, or another API
+    worker serving the dashboard) therefore reach this worker's chat replies up to that TTL late;
+    changes made through this worker drop its cached context immediately.
+    """
+
+    id: UUID
+    name: str
+    url: str
+    content_version: int
+
+
+_api_key_cache = LRUCache(max_entries=settings.API_KEY_CACHE_SIZE, ttl=settings.API_KEY_CACHE_TTL)
+_unknown_key_cache = LRUCache(max_entries=settings.API_KEY_CACHE_SIZE, ttl=settings.API_KEY_NEGATIVE_TTL)
+register_cache("api_keys", _api_key_cache)
+register_cache("api_keys_unknown", _unknown_key_cache)
+
+
 async def get_site_by_api_key(
     x_api_key: str = Header(..., alias="X-API-Key"),
     db: AsyncSession = Depends(get_db),
-) -> Site:
+) -> WidgetSite:
+    site = _api_key_cache.get(x_api_key)
+    if site is not None:
+        return site
+    if _unknown_key_cache.get(x_api_key):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+
     result = await db.execute(select(Site).where(Site.api_key == x_api_key))
-    site = result.scalar_one_or_none()
-    if not site:
+    db_site = result.scalar_one_or_none()
+    if not db_site:
+        _unknown_key_cache.set(x_api_key, True)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+
+    site = WidgetSite(
+        id=db_site.id,
+        name=db_site.name,
+        url=db_site.url,
+        content_version=db_site.content_version,
+    )
+    _api_key_cache.set(x_api_key, site)
     return site
+
+
+def evict_api_key(api_key: str) -> None:
+    _api_key_cache.pop(api_key)
+    _unknown_key_cache.pop(api_key)
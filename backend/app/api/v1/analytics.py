@@ -1,15 +1,17 @@
 from collections import Counter
+from datetime import date
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...core.database import get_db
 from ...core.security import get_current_user
-from ...models.conversation import Conversation
+from ...models.conversation_stats import ConversationDailyStats
 from ...models.site import Site
 from ...models.user import User
+from ...services.heavy_hitters import question_tracker
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
@@ -17,6 +19,8 @@ router = APIRouter(prefix="/analytics", tags=["analytics"])
 @router.get("/{site_id}")
 async def get_analytics(
     site_id: UUID,
+    start: date | None = Query(None, description="First day to include (UTC)"),
+    end: date | None = Query(None, description="Last day to include (UTC)"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -26,30 +30,26 @@ async def get_analytics(
     if not site_result.scalar_one_or_none():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Site not found")
 
-    convs_result = await db.execute(
-        select(Conversation).where(Conversation.site_id == site_id)
-    )
-    conversations = convs_result.scalars().all()
+    stats_query = select(ConversationDailyStats).where(ConversationDailyStats.site_id == site_id)
+    if start:
+        stats_query = stats_query.where(ConversationDailyStats.day >= start)
+    if end:
+        stats_query = stats_query.where(ConversationDailyStats.day <= end)
+    rollups = (await db.execute(stats_query.order_by(ConversationDailyStats.day))).scalars().all()
 
-    total_conversations = len(conversations)
-    language_counts = Counter()
-    all_questions = []
-    actions_count = 0
+    total_conversations = 0
     total_messages = 0
+    actions_count = 0
+    language_counts = Counter()
+    daily: dict[date, int] = {}
 
-    for conv in conversations:
-        language_counts[conv.language] += 1
-        messages = conv.messages or []
-        total_messages += len(messages)
-        for msg in messages:
-            if msg.get("role") == "user":
-                all_questions.append(msg.get("content", ""))
-        actions_count += len(conv.actions_triggered or [])
-
-    question_counts = Counter(all_questions)
-    top_questions = [
-        {"question": q, "count": c} for q, c in question_counts.most_common(10)
-    ]
+    for row in rollups:
+        total_conversations += row.conversations
+        total_messages += row.messages
+        actions_count += row.actions
+        if row.conversations:
+            language_counts[row.language] += row.conversations
+        daily[row.day] = daily.get(row.day, 0) + row.conversations
 
     avg_messages = total_messages / total_conversations if total_conversations > 0 else 0
 
@@ -57,6 +57,8 @@ async def get_analytics(
         "total_conversations": total_conversations,
         "average_messages_per_conversation": round(avg_messages, 1),
         "language_breakdown": dict(language_counts),
-        "top_questions": top_questions,
+        # Lifetime top questions — the sketch is not bucketed by day, so start/end do not apply
+        "top_questions": await question_tracker.top_questions(db, site_id, 10),
         "total_actions_triggered": actions_count,
+        "daily_conversations": [{"date": day.isoformat(), "count": count} for day, count in daily.items()],
     }
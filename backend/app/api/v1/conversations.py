@@ -0,0 +1,144 @@
+import base64
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta, timezone
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.database import async_session_factory, get_db
+from ...core.security import get_current_user
+from ...models.conversation import Conversation
+from ...models.site import Site
+from ...models.user import User
+from ...schemas.conversation import ConversationPage, ConversationResponse
+from ...services.conversation_archive import conversation_archive, serialize_conversation
+
+router = APIRouter(prefix="/conversations", tags=["conversations"])
+
+EXPORT_BATCH_SIZE = 500
+CSV_COLUMNS = ["id", "visitor_id", "language", "created_at", "ended_at", "message_count", "actions_count", "messages"]
+
+
+@router.get("/{site_id}", response_model=ConversationPage)
+async def list_conversations(
+    site_id: UUID,
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    language: str | None = Query(None, max_length=10),
+    start: date | None = Query(None, description="First day to include (UTC)"),
+    end: date | None = Query(None, description="Last day to include (UTC)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Newest-first page of conversations, keyset-paginated on (created_at, id). Archived conversations are export-only."""
+    await _check_site(db, site_id, current_user)
+
+    query = _filtered(site_id, language, start, end)
+    if cursor:
+        query = query.where(tuple_(Conversation.created_at, Conversation.id) < _decode_cursor(cursor))
+    query = query.order_by(Conversation.created_at.desc(), Conversation.id.desc()).limit(limit + 1)
+
+    rows = (await db.execute(query)).scalars().all()
+    next_cursor = _encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return ConversationPage(
+        items=[ConversationResponse.model_validate(row) for row in rows[:limit]],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/{site_id}/export")
+async def export_conversations(
+    site_id: UUID,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    language: str | None = Query(None, max_length=10),
+    start: date | None = Query(None, description="First day to include (UTC)"),
+    end: date | None = Query(None, description="Last day to include (UTC)"),
+    include_archived: bool = Query(False, description="Also export conversations moved to the archive by retention"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Stream every matching conversation, oldest first: archived segments, then a server-side cursor over the hot table."""
+    await _check_site(db, site_id, current_user)
+
+    query = _filtered(site_id, language, start, end).order_by(Conversation.created_at, Conversation.id)
+    render = _csv_lines if format == "csv" else _ndjson_lines
+
+    async def rows():
+        if include_archived:
+            # Retention archives oldest-first, so archived rows all precede the hot table
+            async for row in conversation_archive.iter_conversations(site_id, start, end, language):
+                yield row
+        # The request's session is closed before the body streams, so the export opens its own
+        async with async_session_factory() as export_db:
+            result = await export_db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            async for conversation in result.scalars():
+                yield serialize_conversation(conversation)
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        render(rows()),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="conversations-{site_id}.{format}"'},
+    )
+
+
+async def _check_site(db: AsyncSession, site_id: UUID, current_user: User) -> None:
+    site_result = await db.execute(
+        select(Site.id).where(Site.id == site_id, Site.user_id == current_user.id)
+    )
+    if not site_result.scalar_one_or_none():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Site not found")
+
+
+def _filtered(site_id: UUID, language: str | None, start: date | None, end: date | None):
+    query = select(Conversation).where(Conversation.site_id == site_id)
+    if language:
+        query = query.where(Conversation.language == language)
+    if start:
+        query = query.where(Conversation.created_at >= datetime.combine(start, time.min, timezone.utc))
+    if end:
+        query = query.where(Conversation.created_at < datetime.combine(end + timedelta(days=1), time.min, timezone.utc))
+    return query
+
+
+def _encode_cursor(conversation: Conversation) -> str:
+    raw = f"{conversation.created_at.isoformat()}|{conversation.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        created_at, conversation_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(conversation_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+async def _ndjson_lines(rows):
+    async for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+async def _csv_lines(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    async for row in rows:
+        writer.writerow([
+            row["id"],
+            row["visitor_id"],
+            row["language"],
+            row["created_at"],
+            row["ended_at"] or "",
+            len(row["messages"]),
+            len(row["actions_triggered"]),
+            json.dumps(row["messages"], ensure_ascii=False),
+        ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
@@ -1,18 +1,27 @@
+import asyncio
+import json
+import time
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...core.database import get_db
+from ...config import settings
+from ...core.database import async_session_factory, get_db
 from ...core.security import get_current_user
+from ...models.crawl_progress import CrawlProgress
 from ...models.page import Page
 from ...models.site import CrawlStatus, Site
 from ...models.user import User
 from ...schemas.crawl import CrawlStatusResponse, CrawlTriggerResponse
+from ...services.crawl_progress import FINAL_STAGES, get_crawl_progress
 
 router = APIRouter(prefix="/crawl", tags=["crawl"])
 
+HEARTBEAT_INTERVAL = 15  # seconds
+
 
 @router.post("/{site_id}", response_model=CrawlTriggerResponse)
 async def trigger_crawl(
@@ -54,13 +63,104 @@ async def crawl_status(
     if not site:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Site not found")
 
-    pages_result = await db.execute(select(Page).where(Page.site_id == site_id))
-    pages_count = len(pages_result.scalars().all())
+    progress = await get_crawl_progress(db, site_id)
+    if progress is not None and _is_stale(site.crawl_status, progress):
+        return CrawlStatusResponse(site_id=site.id, status=site.crawl_status.value)
+    if progress is None:
+        # Sites crawled before progress was recorded
+        pages_result = await db.execute(select(func.count()).select_from(Page).where(Page.site_id == site_id))
+        pages_count = pages_result.scalar_one()
+        return CrawlStatusResponse(
+            site_id=site.id,
+            status=site.crawl_status.value,
+            pages_crawled=pages_count,
+            total_pages=pages_count,
+            started_at=site.last_crawled_at,
+        )
+    return _status_response(site.id, site.crawl_status, progress)
+
+
+@router.get("/{site_id}/events")
+async def crawl_events(
+    site_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Server-Sent Events stream of crawl progress; closes once the crawl is finished.
+
+    The crawler runs in the worker process, so this watches its crawl_progress row and pushes
+    a "progress" event whenever it changes.
+    """
+    result = await db.execute(
+        select(Site.id).where(Site.id == site_id, Site.user_id == current_user.id)
+    )
+    if not result.scalar_one_or_none():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Site not found")
+
+    async def events():
+        last_payload = None
+        last_sent = time.monotonic()
+        deadline = last_sent + settings.CRAWL_PROGRESS_STREAM_TIMEOUT
+        while time.monotonic() < deadline and not await request.is_disconnected():
+            async with async_session_factory() as poll_db:
+                row = (await poll_db.execute(
+                    select(Site.crawl_status, CrawlProgress)
+                    .outerjoin(CrawlProgress, CrawlProgress.site_id == Site.id)
+                    .where(Site.id == site_id)
+                )).one_or_none()
+            if row is None:
+                return
+            crawl_state, progress = row
+
+            if progress is None or _is_stale(crawl_state, progress):
+                payload = CrawlStatusResponse(site_id=site_id, status=crawl_state.value).model_dump_json()
+            else:
+                payload = _status_response(site_id, crawl_state, progress).model_dump_json()
+            if payload != last_payload:
+                yield f"event: progress\ndata: {payload}\n\n"
+                last_payload = payload
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= HEARTBEAT_INTERVAL:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+
+            # A finished crawl has both the site status and its progress record settled
+            if crawl_state not in (CrawlStatus.pending, CrawlStatus.crawling) and (
+                progress is None or progress.stage in FINAL_STAGES
+            ):
+                yield f"event: end\ndata: {json.dumps({'status': crawl_state.value})}\n\n"
+                return
+            await asyncio.sleep(settings.CRAWL_PROGRESS_POLL_INTERVAL)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _is_stale(crawl_state: CrawlStatus, progress: CrawlProgress) -> bool:
+    """Whether the progress row is the previous crawl's, left over until the worker starts the new one."""
+    return crawl_state in (CrawlStatus.pending, CrawlStatus.crawling) and progress.stage in FINAL_STAGES
 
+
+def _status_response(site_id: UUID, crawl_state: CrawlStatus, progress: CrawlProgress) -> CrawlStatusResponse:
     return CrawlStatusResponse(
-        site_id=site.id,
-        status=site.crawl_status.value,
-        pages_crawled=pages_count,
-        total_pages=pages_count,
-        started_at=site.last_crawled_at,
+        site_id=site_id,
+        status=crawl_state.value,
+        stage=progress.stage,
+        pages_crawled=progress.pages_fetched,
+        total_pages=progress.urls_discovered,
+        static_fetches=progress.static_fetches,
+        browser_fetches=progress.browser_fetches,
+        pages_saved=progress.pages_saved,
+        pages_unchanged=progress.pages_unchanged,
+        sections_reused=progress.sections_reused,
+        sections_total=progress.sections_total,
+        sections_summarized=progress.sections_summarized,
+        error=progress.error,
+        started_at=progress.started_at,
+        updated_at=progress.updated_at,
+        finished_at=progress.finished_at,
     )
@@ -6,6 +6,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from ...api.deps import evict_api_key
 from ...core.database import get_db
 from ...core.security import generate_api_key, get_current_user
 from ...models.page import Page
@@ -13,6 +14,7 @@ from ...models.section import Section
 from ...models.site import Site
 from ...models.user import User
 from ...models.widget_config import WidgetConfig
+from ...schemas.crawl import CrawlProfileResponse, CrawlProfileSettings
 from ...schemas.site import (
     PageResponse,
     SectionResponse,
@@ -21,6 +23,10 @@ from ...schemas.site import (
     SiteMapResponse,
     SiteResponse,
 )
+from ...services.chat_context import bump_content_version, invalidate_chat_context
+from ...services.conversation_archive import conversation_archive
+from ...services.crawl_profiles import resolve_profile
+from ...services.section_index import rebuild_section_index
 
 router = APIRouter(prefix="/sites", tags=["sites"])
 
@@ -140,10 +146,56 @@ async def update_section(
     if data.section_id is not None:
         section.section_id = data.section_id
 
+    await db.flush()
+    await rebuild_section_index(db, site_id)
+    await bump_content_version(db, site_id)
     await db.flush()
     return {"status": "updated"}
 
 
+@router.get("/{site_id}/crawl-profile", response_model=CrawlProfileResponse)
+async def get_crawl_profile(
+    site_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    result = await db.execute(
+        select(Site).where(Site.id == site_id, Site.user_id == current_user.id)
+    )
+    site = result.scalar_one_or_none()
+    if not site:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Site not found")
+    return _crawl_profile_response(site)
+
+
+@router.put("/{site_id}/crawl-profile", response_model=CrawlProfileResponse)
+async def update_crawl_profile(
+    site_id: UUID,
+    data: CrawlProfileSettings,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Replace the site's crawl profile overrides; an empty body restores the defaults. Applies from the next crawl."""
+    result = await db.execute(
+        select(Site).where(Site.id == site_id, Site.user_id == current_user.id)
+    )
+    site = result.scalar_one_or_none()
+    if not site:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Site not found")
+
+    site.crawl_profile = data.model_dump(exclude_none=True) or None
+    await db.flush()
+    return _crawl_profile_response(site)
+
+
+def _crawl_profile_response(site: Site) -> CrawlProfileResponse:
+    return CrawlProfileResponse(
+        site_id=site.id,
+        overrides=CrawlProfileSettings(**(site.crawl_profile or {})),
+        effective=resolve_profile(site.crawl_profile).to_dict(),
+    )
+
+
 @router.delete("/{site_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_site(
     site_id: UUID,
@@ -158,3 +210,6 @@ async def delete_site(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Site not found")
     await db.delete(site)
     await db.commit()
+    evict_api_key(site.api_key)
+    invalidate_chat_context(site_id)
+    await asyncio.to_thread(conversation_archive.delete_site, site_id)
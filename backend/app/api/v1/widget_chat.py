@@ -1,24 +1,32 @@
-import asyncio
 import base64
+import json
+import logging
 import re
+import time
 
-from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...api.deps import get_site_by_api_key
+from ...api.deps import WidgetSite, get_site_by_api_key
+from ...config import settings
 from ...core.database import get_db
-from ...models.conversation import Conversation
-from ...models.site import Site
+from ...core.metrics import StageTimer, widget_stage_seconds
 from ...models.widget_config import WidgetConfig
 from ...schemas.chat import ChatRequest, ChatResponse
 from ...schemas.widget_config import WidgetConfigResponse
-from ...services.gemini_service import chat_with_visitor
-from ...services.site_map_builder import get_site_map
+from ...services.audio_store import audio_store
+from ...services.chat_context import build_turn_message, get_chat_context, get_system_prompt
+from ...services.conversation_log import conversation_log
+from ...services.conversation_sessions import append_turn, get_session
+from ...services.gemini_service import chat_with_visitor, stream_chat_with_visitor
+from ...services.history_manager import compact_history
 from ...services.stt_service import transcribe_audio
 from ...services.tts_service import synthesize_speech
 from sqlalchemy import select
 
 router = APIRouter(prefix="/widget", tags=["widget"])
+logger = logging.getLogger(__name__)
 
 
 def detect_language(text: str) -> str:
@@ -56,7 +64,7 @@ def detect_language(text: str) -> str:
 
 @router.get("/config", response_model=WidgetConfigResponse)
 async def widget_get_config(
-    site: Site = Depends(get_site_by_api_key),
+    site: WidgetSite = Depends(get_site_by_api_key),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(WidgetConfig).where(WidgetConfig.site_id == site.id))
@@ -78,92 +86,291 @@ async def widget_get_config(
 @router.post("/chat", response_model=ChatResponse)
 async def widget_chat(
     request: ChatRequest,
-    site: Site = Depends(get_site_by_api_key),
+    http_request: Request,
+    response: Response,
+    site: WidgetSite = Depends(get_site_by_api_key),
     db: AsyncSession = Depends(get_db),
 ):
-    site_map = await get_site_map(db, site.id)
-
-    config_result = await db.execute(select(WidgetConfig).where(WidgetConfig.site_id == site.id))
-    widget_config = config_result.scalar_one_or_none()
-    config_dict = {
-        "greeting_message": widget_config.greeting_message if widget_config else "Hello!",
-    }
+    timer = StageTimer(widget_stage_seconds, "chat")
+    try:
+        with timer.stage("context"):
+            context = await get_chat_context(db, site.id, site.content_version)
 
-    language = request.language
-    if language == "auto":
-        language = detect_language(request.message)
+        with timer.stage("language"):
+            language = request.language
+            if language == "auto":
+                language = detect_language(request.message)
+        timer.language = language
 
-    history = [{"role": m.role, "content": m.content} for m in request.conversation_history]
+        with timer.stage("session"):
+            session = await get_session(db, site.id, request.conversation_id, request.conversation_updated_at)
+        with timer.stage("history"):
+            history = compact_history(_session_history(session, request), context["history_token_budget"])
+        with timer.stage("prompt"):
+            system_prompt = get_system_prompt(context, language)
+            turn_message = build_turn_message(context, request.message, history)
 
-    ai_response = await chat_with_visitor(
-        message=request.message,
-        conversation_history=history,
-        site_map=site_map,
-        widget_config=config_dict,
-        language=language,
-    )
+        with timer.stage("llm"):
+            ai_response = await chat_with_visitor(
+                message=turn_message,
+                conversation_history=history,
+                site_map=context["site_map"],
+                widget_config=context["config"],
+                language=language,
+                system_prompt=system_prompt,
+            )
 
-    # TTS is optional — skip if not configured
-    audio_base64 = ""
-    audio_fmt = "audio/mp3"
-    try:
-        audio_bytes = await synthesize_speech(ai_response["text"], ai_response["language"])
-        audio_base64 = base64.b64encode(audio_bytes).decode()
-        if ai_response["language"] == "uz":
-            audio_fmt = "audio/wav"
-    except Exception as e:
-        import logging
-        logging.getLogger(__name__).error(f"TTS failed for lang={ai_response['language']}: {e}")
+        audio_fields = await _deliver_audio(
+            ai_response["text"], ai_response["language"], request.audio_delivery, http_request, timer
+        )
 
-    asyncio.create_task(
-        _log_conversation(site.id, request.message, ai_response)
-    )
+        conversation_log.enqueue(append_turn(session, request.message, ai_response))
+    except Exception:
+        timer.finish("error")
+        raise
+    timer.finish()
+    _set_timing_headers(response.headers, timer)
 
     return ChatResponse(
         text=ai_response["text"],
-        audio=audio_base64,
-        audio_format=audio_fmt,
+        **audio_fields,
         actions=[{"type": a["type"], "params": a["params"]} for a in ai_response["actions"]],
         language=ai_response["language"],
+        conversation_id=session["id"],
+        persisted=session["stored"],
+        conversation_updated_at=session["ended_at"],
+    )
+
+
+@router.post("/chat/stream")
+async def widget_chat_stream(
+    request: ChatRequest,
+    http_request: Request,
+    site: WidgetSite = Depends(get_site_by_api_key),
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream the reply as NDJSON frames: text deltas and actions first, then audio, then a final "done" frame.
+
+    Server-Timing covers only the stages before the first byte; the streamed stages are still
+    recorded in /metrics.
+    """
+    timer = StageTimer(widget_stage_seconds, "chat_stream")
+    try:
+        with timer.stage("context"):
+            context = await get_chat_context(db, site.id, site.content_version)
+
+        with timer.stage("language"):
+            language = request.language
+            if language == "auto":
+                language = detect_language(request.message)
+        timer.language = language
+
+        with timer.stage("session"):
+            session = await get_session(db, site.id, request.conversation_id, request.conversation_updated_at)
+        with timer.stage("history"):
+            history = compact_history(_session_history(session, request), context["history_token_budget"])
+        with timer.stage("prompt"):
+            system_prompt = get_system_prompt(context, language)
+            turn_message = build_turn_message(context, request.message, history)
+    except Exception:
+        timer.finish("error")
+        raise
+
+    async def frames():
+        ai_response = {"text": "", "actions": [], "language": language}
+        llm_start = time.perf_counter()
+        first_token = None
+        try:
+            async for kind, payload in stream_chat_with_visitor(
+                message=turn_message,
+                conversation_history=history,
+                site_map=context["site_map"],
+                widget_config=context["config"],
+                language=language,
+                system_prompt=system_prompt,
+            ):
+                if first_token is None:
+                    first_token = time.perf_counter() - llm_start
+                    timer.record("llm_first_token", first_token)
+                if kind == "text":
+                    ai_response["text"] += payload
+                    yield _frame({"type": "text", "text": payload})
+                else:
+                    ai_response["actions"].append(payload)
+                    yield _frame({"type": "action", "action": payload})
+        except Exception as e:
+            logger.error(f"Chat stream failed for site {site.id}: {e}")
+            timer.record("llm", time.perf_counter() - llm_start, "error")
+            timer.finish("error")
+            yield _frame({"type": "error", "detail": "Chat failed"})
+            return
+        timer.record("llm", time.perf_counter() - llm_start)
+
+        audio_fields = await _deliver_audio(ai_response["text"], language, request.audio_delivery, http_request, timer)
+        if audio_fields["audio"] or audio_fields["audio_url"]:
+            yield _frame({"type": "audio", **audio_fields})
+
+        conversation_log.enqueue(append_turn(session, request.message, ai_response))
+        timer.finish()
+
+        yield _frame({
+            "type": "done",
+            "text": ai_response["text"],
+            "actions": ai_response["actions"],
+            "language": language,
+            "conversation_id": str(session["id"]),
+            "persisted": session["stored"],
+            "conversation_updated_at": session["ended_at"].isoformat(),
+        })
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    _set_timing_headers(headers, timer)
+    return StreamingResponse(frames(), media_type="application/x-ndjson", headers=headers)
+
+
+def _set_timing_headers(headers, timer: StageTimer) -> None:
+    headers["Server-Timing"] = timer.server_timing()
+    # The widget is embedded cross-origin; without this, RUM on the host page sees no server timings
+    headers["Timing-Allow-Origin"] = "*"
+
+
+def _frame(data: dict) -> str:
+    return json.dumps(data, ensure_ascii=False) + "\n"
+
+
+def _audio_mime(language: str) -> str:
+    return "audio/wav" if language == "uz" else "audio/mp3"
+
+
+async def _synthesize_audio(text: str, language: str) -> bytes:
+    """TTS is optional, so failures yield empty audio."""
+    try:
+        return await synthesize_speech(text, language)
+    except Exception as e:
+        logger.error(f"TTS failed for lang={language}: {e}")
+        return b""
+
+
+async def _deliver_audio(text: str, language: str, delivery: str, http_request: Request, timer: StageTimer) -> dict:
+    """Build the audio fields of a chat reply for the requested delivery mode."""
+    audio_fmt = _audio_mime(language)
+    if delivery == "deferred":
+        audio_id = await audio_store.submit(audio_fmt, lambda: synthesize_speech(text, language))
+        return {"audio": "", "audio_format": audio_fmt, "audio_url": _audio_url(http_request, audio_id)}
+
+    tts_start = time.perf_counter()
+    audio_bytes = await _synthesize_audio(text, language)
+    timer.record("tts", time.perf_counter() - tts_start, "ok" if audio_bytes else "error")
+    if not audio_bytes:
+        return {"audio": "", "audio_format": audio_fmt, "audio_url": ""}
+    if delivery == "url":
+        audio_id = await audio_store.put(audio_bytes, audio_fmt)
+        return {"audio": "", "audio_format": audio_fmt, "audio_url": _audio_url(http_request, audio_id)}
+    with timer.stage("encode"):
+        audio_b64 = base64.b64encode(audio_bytes).decode()
+    return {"audio": audio_b64, "audio_format": audio_fmt, "audio_url": ""}
+
+
+def _audio_url(http_request: Request, audio_id: str) -> str:
+    """Absolute URL, since the widget resolves it against the customer's page, not this API."""
+    if settings.API_URL:
+        return settings.API_URL.rstrip("/") + http_request.app.url_path_for("widget_get_audio", audio_id=audio_id)
+    return str(http_request.url_for("widget_get_audio", audio_id=audio_id))
+
+
+@router.get("/audio/{audio_id}", name="widget_get_audio")
+async def widget_get_audio(
+    audio_id: str,
+    wait: float = Query(settings.AUDIO_WAIT_TIMEOUT, ge=0, le=settings.AUDIO_WAIT_TIMEOUT),
+    range_header: str | None = Header(None, alias="Range"),
+):
+    """Serve stored audio; for deferred replies, block up to `wait` seconds for synthesis to finish."""
+    entry = await audio_store.wait(audio_id, timeout=wait)
+    if entry is None:
+        if await audio_store.is_pending(audio_id):
+            return Response(status_code=status.HTTP_202_ACCEPTED, headers={"Retry-After": "1"})
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audio not found or expired")
+    if entry.failed:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Audio synthesis failed")
+    audio_bytes, audio_fmt = entry.audio, entry.mime_type
+    total = len(audio_bytes)
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": f"private, max-age={int(settings.AUDIO_URL_TTL)}, immutable",
+        "ETag": f'"{audio_id}"',
+    }
+    if not range_header:
+        return Response(content=audio_bytes, media_type=audio_fmt, headers=headers)
+
+    byte_range = _parse_range(range_header, total)
+    if byte_range is None:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**headers, "Content-Range": f"bytes */{total}"},
+        )
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+    return Response(
+        content=audio_bytes[start:end + 1],
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=audio_fmt,
+        headers=headers,
     )
 
 
+def _parse_range(range_header: str, total: int) -> tuple[int, int] | None:
+    """Parse a single "bytes=start-end" range (suffix and open-ended forms included)."""
+    match = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", range_header)
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        start, end = max(total - int(last), 0), total - 1
+    else:
+        start = int(first)
+        end = min(int(last), total - 1) if last else total - 1
+    if start > end or start >= total:
+        return None
+    return start, end
+
+
 @router.post("/transcribe")
 async def widget_transcribe(
+    response: Response,
     audio: UploadFile = File(...),
-    site: Site = Depends(get_site_by_api_key),
+    site: WidgetSite = Depends(get_site_by_api_key),
     db: AsyncSession = Depends(get_db),
 ):
-    audio_bytes = await audio.read()
+    timer = StageTimer(widget_stage_seconds, "transcribe")
+    try:
+        with timer.stage("read"):
+            audio_bytes = await audio.read()
 
-    config_result = await db.execute(select(WidgetConfig).where(WidgetConfig.site_id == site.id))
-    widget_config = config_result.scalar_one_or_none()
+        with timer.stage("config"):
+            config_result = await db.execute(select(WidgetConfig).where(WidgetConfig.site_id == site.id))
+            widget_config = config_result.scalar_one_or_none()
 
-    lang_hints = ["uz-UZ", "ru-RU", "en-US"]
-    if widget_config and widget_config.supported_languages:
-        lang_map = {"uz": "uz-UZ", "ru": "ru-RU", "en": "en-US"}
-        lang_hints = [lang_map.get(l, f"{l}-{l.upper()}") for l in widget_config.supported_languages]
+        lang_hints = ["uz-UZ", "ru-RU", "en-US"]
+        if widget_config and widget_config.supported_languages:
+            lang_map = {"uz": "uz-UZ", "ru": "ru-RU", "en": "en-US"}
+            lang_hints = [lang_map.get(l, f"{l}-{l.upper()}") for l in widget_config.supported_languages]
 
-    result = await transcribe_audio(audio_bytes=audio_bytes, language_hints=lang_hints)
+        with timer.stage("stt"):
+            result = await transcribe_audio(audio_bytes=audio_bytes, language_hints=lang_hints)
+        timer.language = result["language"]
+    except Exception:
+        timer.finish("error")
+        raise
+    timer.finish()
+    _set_timing_headers(response.headers, timer)
     return result
 
 
-async def _log_conversation(site_id, user_message, ai_response):
-    try:
-        from ...core.database import async_session_factory
-        async with async_session_factory() as db:
-            conv = Conversation(
-                site_id=site_id,
-                visitor_id="anonymous",
-                messages=[
-                    {"role": "user", "content": user_message},
-                    {"role": "assistant", "content": ai_response["text"]},
-                ],
-                language=ai_response.get("language", "en"),
-                actions_triggered=ai_response.get("actions", []),
-            )
-            db.add(conv)
-            await db.commit()
-    except Exception as e:
-        import logging
-        logging.getLogger(__name__).error(f"Failed to log conversation: {e}")
+def _session_history(session: dict, request: ChatRequest) -> list[dict]:
+    """The conversation so far: the server's copy, or the widget's while the server's may lag behind it."""
+    sent = [{"role": m.role, "content": m.content} for m in request.conversation_history]
+    # Before the conversation is persisted, turns another worker has buffered are only in the widget's copy
+    if not session["stored"] and len(sent) > len(session["messages"]):
+        return sent
+    return list(session["messages"])
@@ -10,6 +10,7 @@ from ...models.site import Site
 from ...models.user import User
 from ...models.widget_config import WidgetConfig
 from ...schemas.widget_config import WidgetConfigResponse, WidgetConfigUpdate
+from ...services.chat_context import bump_content_version
 
 router = APIRouter(tags=["widget-config"])
 
@@ -55,6 +56,7 @@ async def update_widget_config(
     for field, value in update_data.items():
         setattr(config, field, value)
 
+    await bump_content_version(db, site_id)
     await db.flush()
     await db.refresh(config)
     return config
@@ -0,0 +1,114 @@
+import os
+import time
+from contextlib import contextmanager
+
+# Seconds; spans cache hits (sub-millisecond) through slow LLM and TTS calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Label values are bounded: anything else the client reports is recorded as "other"
+KNOWN_LANGUAGES = ("uz", "ru", "en", "unknown")
+
+_registry: list["Histogram"] = []
+
+
+class Histogram:
+    """Cumulative Prometheus-style histogram with labels, kept in process memory.
+
+    Each API worker keeps its own series, and render() labels them with the worker's pid.
+    """
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...], buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}  # label values -> [bucket counts..., sum, count]
+        _registry.append(self)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        worker = os.getpid()
+        for key, series in sorted(self._series.items()):
+            labels = ",".join([f'worker="{worker}"'] + [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)])
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-2]}")
+            lines.append(f"{self.name}_count{{{labels}}} {series[-1]}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_metrics() -> str:
+    """Text exposition (format 0.0.4) of every histogram in this process.
+
+    With several uvicorn workers a scrape reaches whichever worker accepts it, so each series
+    carries a `worker` label; aggregate with `sum without (worker)` and expect a worker's series
+    to advance only on scrapes that land on it.
+    """
+    return "\n".join(line for histogram in _registry for line in histogram.render()) + "\n"
+
+
+class StageTimer:
+    """Times the stages of one request for a stage histogram and a Server-Timing header.
+
+    Observations are held until finish(), since the request's language is often only known
+    partway through.
+    """
+
+    def __init__(self, histogram: Histogram, endpoint: str):
+        self.histogram = histogram
+        self.endpoint = endpoint
+        self.language = "unknown"
+        self._started = time.perf_counter()
+        self._stages: list[tuple[str, float, str]] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            yield
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            self._stages.append((name, time.perf_counter() - start, outcome))
+
+    def record(self, name: str, seconds: float, outcome: str = "ok") -> None:
+        self._stages.append((name, seconds, outcome))
+
+    def finish(self, outcome: str = "ok") -> None:
+        self._stages.append(("total", time.perf_counter() - self._started, outcome))
+        language = self.language if self.language in KNOWN_LANGUAGES else "other"
+        for name, seconds, stage_outcome in self._stages:
+            self.histogram.observe(
+                seconds, endpoint=self.endpoint, stage=name, language=language, outcome=stage_outcome
+            )
+
+    def server_timing(self) -> str:
+        total = (time.perf_counter() - self._started) * 1000
+        parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds, _ in self._stages if name != "total"]
+        parts.append(f"total;dur={total:.1f}")
+        return ", ".join(parts)
+
+
+widget_stage_seconds = Histogram(
+    "voiceai_widget_stage_seconds",
+    "Time spent in each stage of widget chat and transcription requests.",
+    ("endpoint", "stage", "language", "outcome"),
+)
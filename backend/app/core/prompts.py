@@ -1,4 +1,9 @@
-def build_system_prompt(site_map: dict, config: dict, language: str) -> str:
+from .text import estimate_tokens
+
+
+def build_system_prompt(site_map: dict, config: dict, language: str, compact: bool = False) -> str:
+    """Build the system instruction; `compact` lists navigation targets only and leaves section
+    content to build_relevant_content() on each turn."""
     site_name = site_map.get("site_name", "this website")
     site_url = site_map.get("site_url", "")
 
@@ -9,7 +14,8 @@ def build_system_prompt(site_map: dict, config: dict, language: str) -> str:
         for section in page.get("sections", []):
             sid = section['section_id']
             site_structure += f"  SECTION ID: \"{sid}\" — Heading: \"{section['heading']}\"\n"
-            site_structure += f"    Content: {section['content_summary']}\n"
+            if not compact:
+                site_structure += f"    Content: {section['content_summary']}\n"
             section_ids.append(f"{page['url']}{sid}")
 
     section_list = ", ".join(f'"{s}"' for s in section_ids)
@@ -60,7 +66,42 @@ Your name is "{site_name} Assistant". You were created by the {site_name} team s
 - Even if you already navigated to a section before, call navigate_to AGAIN if the user asks about it again
 
 ═══ WEBSITE STRUCTURE ═══
-{site_structure}
+{site_structure}{_COMPACT_NOTE if compact else ""}
 
 GREETING: {config.get('greeting_message', 'Hello! How can I help you today?')}
 """
+
+
+_COMPACT_NOTE = """
+Section content is not listed above. Each visitor message may start with a RELEVANT WEBSITE CONTENT block
+selected for that message — answer from it, and navigate to the sections it names.
+"""
+
+
+def build_relevant_content(site_map: dict, targets: list[tuple[str, str]], token_budget: int) -> str:
+    """Render the retrieved sections, most relevant first, until the token budget is spent."""
+    sections = {
+        (page["url"], section["section_id"]): (page, section)
+        for page in site_map.get("pages", [])
+        for section in page.get("sections", [])
+    }
+
+    block = ""
+    used = 0
+    for target in targets:
+        if target not in sections:
+            continue
+        page, section = sections[target]
+        entry = (
+            f"SECTION \"{page['url']}{section['section_id']}\" on page \"{page['title']}\" — "
+            f"Heading: \"{section['heading']}\"\n  Content: {section['content_summary']}\n"
+        )
+        cost = estimate_tokens(entry)
+        if used + cost > token_budget:
+            break
+        block += entry
+        used += cost
+
+    if not block:
+        return ""
+    return f"RELEVANT WEBSITE CONTENT (for reference, not from the visitor):\n{block}"
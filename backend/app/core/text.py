@@ -0,0 +1,33 @@
+import re
+import unicodedata
+
+# Uzbek/Russian Cyrillic -> Uzbek Latin, so both scripts (and mixed-script input) fold to one form
+_CYRILLIC_TO_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "yo", "ж": "j", "з": "z",
+    "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r",
+    "с": "s", "т": "t", "у": "u", "ф": "f", "х": "x", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sh",
+    "ъ": "", "ы": "i", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+    "ў": "o'", "қ": "q", "ғ": "g'", "ҳ": "h",
+}
+_TRANSLIT_TABLE = str.maketrans(_CYRILLIC_TO_LATIN)
+
+# Uzbek writes oʻ/gʻ and the tutuq belgisi with several look-alike apostrophes
+_APOSTROPHES = re.compile(r"[ʻʼ‘’`´]")
+_WORD = re.compile(r"[\w']+")
+
+
+def fold_text(text: str) -> str:
+    """Case-fold, unify apostrophes and transliterate Cyrillic to Latin."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _APOSTROPHES.sub("'", text)
+    return text.translate(_TRANSLIT_TABLE)
+
+
+def tokenize(text: str) -> list[str]:
+    words = (w.strip("'") for w in _WORD.findall(fold_text(text)))
+    return [w for w in words if len(w) > 1]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for budgeting prompts without a tokenizer."""
+    return len(text) // 4 + 1
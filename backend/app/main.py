@@ -3,15 +3,29 @@ from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 
 from .api.v1.router import api_router
+from .core.cache import cache_stats
 from .core.database import engine
+from .core.metrics import render_metrics
+from .services.audio_store import audio_store
+from .services.conversation_log import conversation_log
+from .services.heavy_hitters import question_tracker
+from .services.provider_clients import provider_clients
+from .services.providers import provider_stats
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await provider_clients.start()
+    conversation_log.start()
+    question_tracker.start()
     yield
+    await audio_store.close()
+    await conversation_log.stop()
+    await question_tracker.stop()
+    await provider_clients.close()
     await engine.dispose()
 
 
@@ -27,7 +41,8 @@ app.add_middleware(
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["POST", "GET", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["X-API-Key", "Content-Type", "Authorization"],
+    allow_headers=["X-API-Key", "Content-Type", "Authorization", "Range"],
+    expose_headers=["Server-Timing"],
 )
 
 app.include_router(api_router, prefix="/api/v1")
@@ -38,6 +53,21 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/caches")
+async def health_caches():
+    return cache_stats()
+
+
+@app.get("/health/providers")
+async def health_providers():
+    return {**provider_clients.stats(), **provider_stats()}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/widget.js")
 async def serve_widget():
     widget_path = Path("/widget/dist/widget.js")
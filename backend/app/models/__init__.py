@@ -4,5 +4,8 @@ from .page import Page
 from .section import Section
 from .widget_config import WidgetConfig
 from .conversation import Conversation
+from .conversation_stats import ConversationDailyStats
+from .question_sketch import QuestionSketch
+from .crawl_progress import CrawlProgress
 
-__all__ = ["User", "Site", "Page", "Section", "WidgetConfig", "Conversation"]
+__all__ = ["User", "Site", "Page", "Section", "WidgetConfig", "Conversation", "ConversationDailyStats", "QuestionSketch", "CrawlProgress"]
@@ -0,0 +1,23 @@
+import uuid
+from datetime import date
+
+from sqlalchemy import Date, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .user import Base
+
+
+class ConversationDailyStats(Base):
+    """Per site, day and language rollup of conversation activity, maintained as conversations are logged."""
+
+    __tablename__ = "conversation_daily_stats"
+
+    site_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("sites.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    language: Mapped[str] = mapped_column(String(10), primary_key=True)
+    conversations: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    messages: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    actions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
@@ -0,0 +1,32 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .user import Base
+
+
+class CrawlProgress(Base):
+    """Live counters of a site's current (or last) crawl, written by the crawler worker."""
+
+    __tablename__ = "crawl_progress"
+
+    site_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("sites.id", ondelete="CASCADE"), primary_key=True
+    )
+    stage: Mapped[str] = mapped_column(String(20), nullable=False)
+    urls_discovered: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    pages_fetched: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    static_fetches: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    browser_fetches: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    pages_saved: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    pages_unchanged: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    sections_reused: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    sections_total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    sections_summarized: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 
 from sqlalchemy import DateTime, ForeignKey, String, Text, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSON, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .user import Base
@@ -17,6 +17,12 @@ class Page(Base):
     title: Mapped[str] = mapped_column(String(500), nullable=False)
     meta_description: Mapped[str | None] = mapped_column(Text, nullable=True)
     crawled_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # Change detection for incremental re-crawls: HTTP validators (static fetches only), a hash of
+    # the extracted content, and the page's links so a 304 can still extend the crawl frontier
+    etag: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    last_modified: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    links: Mapped[dict | None] = mapped_column(JSON, nullable=True, deferred=True)
 
     site = relationship("Site", back_populates="pages")
     sections = relationship("Section", back_populates="page", cascade="all, delete-orphan", order_by="Section.order")
@@ -17,5 +17,6 @@ class Section(Base):
     content_summary: Mapped[str] = mapped_column(Text, nullable=False, default="")
     content_raw: Mapped[str] = mapped_column(Text, nullable=False, default="")
     order: Mapped[int] = mapped_column(Integer, default=0)
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     page = relationship("Page", back_populates="sections")
@@ -2,7 +2,7 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Enum, ForeignKey, String, func
+from sqlalchemy import DateTime, Enum, ForeignKey, Integer, String, func
 from sqlalchemy.dialects.postgresql import JSON, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -27,6 +27,10 @@ class Site(Base):
     allowed_origins: Mapped[list] = mapped_column(JSON, default=list)
     crawl_status: Mapped[CrawlStatus] = mapped_column(Enum(CrawlStatus), default=CrawlStatus.pending)
     last_crawled_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    content_version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
+    section_index: Mapped[dict | None] = mapped_column(JSON, nullable=True, deferred=True)
+    # Per-site overrides of the crawl profile (see services/crawl_profiles.py); None uses CRAWL_PROFILE
+    crawl_profile: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", back_populates="sites")
@@ -1,7 +1,7 @@
 import enum
 import uuid
 
-from sqlalchemy import Boolean, Enum, ForeignKey, String, Text
+from sqlalchemy import Boolean, Enum, ForeignKey, Integer, String, Text
 from sqlalchemy.dialects.postgresql import JSON, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -24,5 +24,6 @@ class WidgetConfig(Base):
     supported_languages: Mapped[list] = mapped_column(JSON, default=lambda: ["uz", "ru", "en"])
     voice_enabled: Mapped[bool] = mapped_column(Boolean, default=True)
     avatar_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    history_token_budget: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     site = relationship("Site", back_populates="widget_config")
@@ -1,6 +1,11 @@
+from datetime import datetime
 from typing import Literal
+from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+
+SUPPORTED_LANGUAGES = ("uz", "ru", "en")
 
 
 class ChatMessage(BaseModel):
@@ -10,9 +15,24 @@ class ChatMessage(BaseModel):
 
 class ChatRequest(BaseModel):
     message: str
+    # Continue a server-side conversation; conversation_history is only needed, and only read,
+    # until a reply says the conversation is persisted
+    conversation_id: UUID | None = None
     conversation_history: list[ChatMessage] = []
-    language: str = "auto"
+    # The conversation_updated_at of the latest reply, so the server can tell its cached copy is behind
+    conversation_updated_at: datetime | None = None
+    language: Literal["auto", "uz", "ru", "en"] = "auto"
     current_url: str = "/"
+    # "inline": base64 in `audio`; "url": raw bytes served from `audio_url`;
+    # "deferred": reply returns before TTS finishes and `audio_url` waits for it
+    audio_delivery: Literal["inline", "url", "deferred"] = "inline"
+
+    @field_validator("language", mode="before")
+    @classmethod
+    def normalize_language(cls, value):
+        # Locale tags like "ru-RU" map to their language; anything else unsupported is auto-detected
+        code = str(value or "").replace("_", "-").split("-")[0].lower()
+        return code if code in SUPPORTED_LANGUAGES else "auto"
 
 
 class ChatAction(BaseModel):
@@ -24,5 +44,10 @@ class ChatResponse(BaseModel):
     text: str
     audio: str = ""
     audio_format: str = "audio/mp3"
+    audio_url: str = ""
     actions: list[ChatAction] = []
     language: str
+    conversation_id: UUID | None = None
+    # Whether earlier turns are stored server-side; until then the widget keeps sending its history
+    persisted: bool = False
+    conversation_updated_at: datetime | None = None
@@ -0,0 +1,21 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class ConversationResponse(BaseModel):
+    id: UUID
+    visitor_id: str
+    language: str
+    messages: list = []
+    actions_triggered: list = []
+    created_at: datetime
+    ended_at: datetime | None = None
+
+    model_config = {"from_attributes": True}
+
+
+class ConversationPage(BaseModel):
+    items: list[ConversationResponse] = []
+    next_cursor: str | None = None
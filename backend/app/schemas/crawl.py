@@ -1,7 +1,8 @@
 from datetime import datetime
+from typing import Literal
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class CrawlTriggerResponse(BaseModel):
@@ -13,6 +14,39 @@ class CrawlTriggerResponse(BaseModel):
 class CrawlStatusResponse(BaseModel):
     site_id: UUID
     status: str
+    stage: str | None = None
     pages_crawled: int = 0
     total_pages: int = 0
+    static_fetches: int = 0
+    browser_fetches: int = 0
+    pages_saved: int = 0
+    pages_unchanged: int = 0
+    sections_reused: int = 0
+    sections_total: int = 0
+    sections_summarized: int = 0
+    error: str | None = None
     started_at: datetime | None = None
+    updated_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class CrawlProfileSettings(BaseModel):
+    """Per-site crawl profile overrides; unset fields fall back to the named base profile."""
+
+    profile: Literal["default", "lean", "full"] | None = None
+    block_resource_types: list[
+        Literal["stylesheet", "image", "media", "font", "script", "texttrack", "xhr", "fetch",
+                "eventsource", "websocket", "manifest", "other"]
+    ] | None = None
+    third_party: Literal["allow", "known", "block"] | None = None
+    allowed_hosts: list[str] | None = Field(None, max_length=50)
+    readiness: Literal["dom_stable", "content", "networkidle", "load"] | None = None
+    stability_ms: int | None = Field(None, ge=0, le=10000)
+    ready_timeout_ms: int | None = Field(None, ge=500, le=60000)
+    fetch_mode: Literal["auto", "static", "browser"] | None = None
+
+
+class CrawlProfileResponse(BaseModel):
+    site_id: UUID
+    overrides: CrawlProfileSettings
+    effective: dict
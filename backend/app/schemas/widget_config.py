@@ -12,6 +12,7 @@ class WidgetConfigResponse(BaseModel):
     supported_languages: list[str]
     voice_enabled: bool
     avatar_url: str | None = None
+    history_token_budget: int | None = None
 
     model_config = {"from_attributes": True}
 
@@ -23,3 +24,4 @@ class WidgetConfigUpdate(BaseModel):
     supported_languages: list[str] | None = None
     voice_enabled: bool | None = None
     avatar_url: str | None = None
+    history_token_budget: int | None = Field(None, ge=200, le=32000)
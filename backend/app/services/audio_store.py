@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import os
+import re
+import secrets
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from ..config import settings
+from ..core.cache import register_cache
+
+logger = logging.getLogger(__name__)
+
+AUDIO_ID_RE = re.compile(r"[A-Za-z0-9_-]{32}")  # secrets.token_urlsafe(24)
+POLL_INTERVAL = 0.1
+EVICT_TO = 0.9  # of max_bytes, so the next writes don't cross the cap and trigger another sweep straight away
+
+
+class _AudioEntry:
+    __slots__ = ("audio", "mime_type", "failed")
+
+    def __init__(self, audio: bytes = b"", mime_type: str = "", failed: bool = False):
+        self.audio = audio
+        self.mime_type = mime_type
+        self.failed = failed
+
+
+class AudioStore:
+    """Short-lived, byte-bounded store of synthesized replies served by /widget/audio/{id}.
+
+    Ids are random tokens, so holding one is what authorizes playback — <audio> elements cannot
+    send the X-API-Key header. Entries are either stored ready-made (put) or reserved and filled
+    by a background synthesis job (submit) that runs under a concurrency limit.
+
+    Audio lives in a directory shared by all API workers, so any worker can serve an id another
+    one minted: `<id>` holds the mime type and audio, `<id>.pending` marks a running job and
+    `<id>.failed` a job that gave up. Waiters on the worker running the job are woken directly;
+    others poll the directory. Expiry uses file mtimes and the byte cap is enforced by scanning
+    the directory, evicting the oldest finished audio first — pending jobs are never evicted.
+
+    The scan runs every sweep_interval seconds, or sooner once the directory's size as of the last
+    scan plus what this worker has written since crosses max_bytes. Expired audio is also dropped
+    when it is read.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttl: float, max_concurrency: int, sweep_interval: float):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self.max_concurrency = max_concurrency
+        self._semaphore: asyncio.Semaphore | None = None
+        self._sweep_lock = asyncio.Lock()
+        self._jobs: dict[str, asyncio.Event] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._entries = 0
+        self._used = 0  # As of the last sweep, plus what this worker has written since
+        self._swept_at: float | None = None
+        self.stored = 0
+        self.served = 0
+        self.expired = 0
+        self.evicted = 0
+        self.jobs_submitted = 0
+        self.jobs_failed = 0
+
+    async def put(self, audio: bytes, mime_type: str) -> str:
+        audio_id = secrets.token_urlsafe(24)
+        await asyncio.to_thread(self._write_ready, audio_id, mime_type, audio)
+        self._stored(audio)
+        await self._sweep()
+        return audio_id
+
+    async def submit(self, mime_type: str, synthesize: Callable[[], Awaitable[bytes]]) -> str:
+        """Reserve an id now and fill it from `synthesize()` in the background."""
+        audio_id = secrets.token_urlsafe(24)
+        await asyncio.to_thread(self._write_pending, audio_id)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        done = self._jobs[audio_id] = asyncio.Event()
+        task = asyncio.create_task(self._run_job(audio_id, mime_type, synthesize, done))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self.jobs_submitted += 1
+        return audio_id
+
+    async def wait(self, audio_id: str, timeout: float) -> _AudioEntry | None:
+        """Return the entry once its audio is ready or failed; None if unknown, expired, or still pending at timeout."""
+        if not AUDIO_ID_RE.fullmatch(audio_id):
+            return None
+        deadline = time.monotonic() + timeout
+        while True:
+            state, entry = await asyncio.to_thread(self._read, audio_id)
+            if state == "expired":
+                self.expired += 1
+            if state != "pending":
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            done = self._jobs.get(audio_id)
+            try:
+                if done is not None:
+                    await asyncio.wait_for(done.wait(), remaining)
+                else:
+                    await asyncio.sleep(min(POLL_INTERVAL, remaining))
+            except asyncio.TimeoutError:
+                pass
+        if entry is not None and not entry.failed:
+            self.served += 1
+        return entry
+
+    async def is_pending(self, audio_id: str) -> bool:
+        if not AUDIO_ID_RE.fullmatch(audio_id):
+            return False
+        return await asyncio.to_thread(self._path(audio_id, ".pending").exists)
+
+    async def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run_job(
+        self, audio_id: str, mime_type: str, synthesize: Callable[[], Awaitable[bytes]], done: asyncio.Event
+    ) -> None:
+        try:
+            async with self._semaphore:
+                audio = await synthesize()
+            await asyncio.to_thread(self._write_ready, audio_id, mime_type, audio)
+            self._stored(audio)
+        except asyncio.CancelledError:
+            # Shutting down: fail the id so other workers stop waiting on it
+            self._write_failed(audio_id)
+            raise
+        except Exception as e:
+            logger.error(f"Background TTS failed for audio {audio_id}: {e}")
+            self.jobs_failed += 1
+            await asyncio.to_thread(self._write_failed, audio_id)
+        finally:
+            done.set()
+            self._jobs.pop(audio_id, None)
+        await self._sweep()
+
+    def _stored(self, audio: bytes) -> None:
+        self.stored += 1
+        self._entries += 1
+        self._used += len(audio)
+
+    async def _sweep(self) -> None:
+        if self._sweep_lock.locked():
+            return  # A sweep is already running on this worker
+        due = self._swept_at is None or time.monotonic() - self._swept_at >= self.sweep_interval
+        if not due and self._used <= self.max_bytes:
+            return
+        async with self._sweep_lock:
+            self._swept_at = time.monotonic()
+            try:
+                entries, used, expired, evicted = await asyncio.to_thread(self._sweep_files, set(self._jobs))
+            except OSError as e:
+                logger.warning(f"Audio store sweep failed: {e}")
+                return
+        self._entries, self._used = entries, used
+        self.expired += expired
+        self.evicted += evicted
+
+    def _path(self, audio_id: str, suffix: str = "") -> Path:
+        return self.directory / f"{audio_id}{suffix}"
+
+    def _write_pending(self, audio_id: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._path(audio_id, ".pending").touch()
+
+    def _write_ready(self, audio_id: str, mime_type: str, audio: bytes) -> None:
+        # The audio appears before the pending marker goes, so readers never see neither
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path(audio_id, ".tmp")
+        tmp_path.write_bytes(mime_type.encode() + b"\n" + audio)
+        os.replace(tmp_path, self._path(audio_id))
+        self._path(audio_id, ".pending").unlink(missing_ok=True)
+
+    def _write_failed(self, audio_id: str) -> None:
+        try:
+            self._path(audio_id, ".failed").touch()
+            self._path(audio_id, ".pending").unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not mark audio {audio_id} failed: {e}")
+
+    def _read(self, audio_id: str) -> tuple[str, _AudioEntry | None]:
+        """Current state of an id: "pending", "ready", "failed", "expired" or "missing"."""
+        # Checked in the reverse order _write_ready/_write_failed change them
+        if self._path(audio_id, ".pending").exists():
+            return "pending", None
+        path = self._path(audio_id)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                return "expired", None
+            data = path.read_bytes()
+        except FileNotFoundError:
+            # Never stored, evicted, or failed
+            if self._path(audio_id, ".failed").exists():
+                return "failed", _AudioEntry(failed=True)
+            return "missing", None
+        mime_type, _, audio = data.partition(b"\n")
+        return "ready", _AudioEntry(audio, mime_type.decode())
+
+    def _sweep_files(self, local_jobs: set[str]) -> tuple[int, int, int, int]:
+        """Drop expired files and, over max_bytes, the oldest audio down to EVICT_TO of it; returns (entries, bytes, expired, evicted)."""
+        if not self.directory.is_dir():
+            return 0, 0, 0, 0
+        now = time.time()
+        ready, expired, evicted = [], 0, 0
+        for item in os.scandir(self.directory):
+            audio_id, _, suffix = item.name.partition(".")
+            try:
+                stat = item.stat()
+            except FileNotFoundError:
+                continue
+            age = now - stat.st_mtime
+            if suffix == "pending":
+                # Jobs can queue behind the concurrency limit, so only markers left by a dead worker go
+                stale = age > 2 * self.ttl and audio_id not in local_jobs
+            else:
+                stale = age > self.ttl
+            if stale:
+                Path(item.path).unlink(missing_ok=True)
+                expired += suffix == ""
+            elif suffix == "":
+                ready.append((stat.st_mtime, stat.st_size, item.path))
+
+        ready.sort()
+        used = sum(size for _, size, _ in ready)
+        target = self.max_bytes * EVICT_TO if used > self.max_bytes else used
+        while used > target and ready:
+            _, size, path = ready.pop(0)
+            Path(path).unlink(missing_ok=True)
+            used -= size
+            evicted += 1
+        return len(ready), used, expired, evicted
+
+    def stats(self) -> dict:
+        return {
+            "entries": self._entries,
+            "bytes": self._used,
+            "max_bytes": self.max_bytes,
+            "stored": self.stored,
+            "served": self.served,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "jobs_submitted": self.jobs_submitted,
+            "jobs_running": len(self._tasks),
+            "jobs_failed": self.jobs_failed,
+        }
+
+
+audio_store = AudioStore(
+    directory=settings.AUDIO_STORE_DIR,
+    max_bytes=settings.AUDIO_STORE_MAX_BYTES,
+    ttl=settings.AUDIO_URL_TTL,
+    max_concurrency=settings.TTS_MAX_CONCURRENCY,
+    sweep_interval=settings.AUDIO_STORE_SWEEP_INTERVAL,
+)
+register_cache("audio_urls", audio_store)
@@ -0,0 +1,110 @@
+from uuid import UUID
+
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..core.cache import LRUCache, register_cache
+from ..core.prompts import build_relevant_content, build_system_prompt
+from ..models.site import Site
+from ..models.widget_config import WidgetConfig
+from .section_index import search_sections
+from .site_map_builder import get_site_map
+
+# site_id -> {"version", "site_map", "config", "index", "history_token_budget", "prompts": {language: prompt}}
+_context_cache = LRUCache(max_entries=settings.CHAT_CONTEXT_CACHE_SIZE)
+register_cache("chat_context", _context_cache)
+
+
+async def get_chat_context(db: AsyncSession, site_id: UUID, version: int) -> dict:
+    """Return the assembled chat context for a site, loading it only when the site's content version changed."""
+    context = _context_cache.get(site_id)
+    if context is not None and context["version"] == version:
+        return context
+
+    site_map = await get_site_map(db, site_id)
+
+    config_result = await db.execute(select(WidgetConfig).where(WidgetConfig.site_id == site_id))
+    widget_config = config_result.scalar_one_or_none()
+    config_dict = {
+        "greeting_message": widget_config.greeting_message if widget_config else "Hello!",
+    }
+
+    index = None
+    if settings.PROMPT_RETRIEVAL_ENABLED:
+        index_result = await db.execute(select(Site.section_index).where(Site.id == site_id))
+        index = index_result.scalar_one_or_none()
+
+    context = {
+        "version": version,
+        "site_map": site_map,
+        "config": config_dict,
+        "index": index,
+        "history_token_budget": (
+            widget_config.history_token_budget
+            if widget_config and widget_config.history_token_budget
+            else settings.HISTORY_TOKEN_BUDGET
+        ),
+        "prompts": {},
+    }
+    _context_cache.set(site_id, context)
+    return context
+
+
+def get_system_prompt(context: dict, language: str) -> str:
+    prompt = context["prompts"].get(language)
+    if prompt is None:
+        compact = context["index"] is not None
+        prompt = build_system_prompt(context["site_map"], context["config"], language, compact=compact)
+        context["prompts"][language] = prompt
+    return prompt
+
+
+def build_turn_message(context: dict, message: str, conversation_history: list) -> str:
+    """Prefix the visitor's message with the sections most relevant to it when the prompt is compact."""
+    if context["index"] is None:
+        return message
+
+    # Include the previous visitor turn so follow-ups like "how much is it?" still find their topic
+    query = message
+    for msg in reversed(conversation_history):
+        if msg["role"] == "user":
+            query = f"{msg['content']} {message}"
+            break
+
+    targets = search_sections(context["index"], query, settings.PROMPT_TOP_K_SECTIONS)
+    relevant = build_relevant_content(context["site_map"], targets, settings.PROMPT_CONTEXT_TOKEN_BUDGET)
+    if not relevant:
+        return message
+    return f"{relevant}\nVISITOR MESSAGE: {message}"
+
+
+async def bump_content_version(db: AsyncSession, site_id: UUID) -> None:
+    """Mark a site's crawled content or widget config as changed so cached chat contexts are rebuilt.
+
+    The cached context is dropped once the transaction commits; dropped earlier, a concurrent chat
+    could cache the old content again before the change is visible.
+    """
+    await db.execute(
+        update(Site)
+        .where(Site.id == site_id)
+        .values(content_version=Site.content_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.info.setdefault("stale_chat_contexts", set()).add(site_id)
+
+
+def invalidate_chat_context(site_id: UUID) -> None:
+    _context_cache.pop(site_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for site_id in session.info.pop("stale_chat_contexts", ()):
+        invalidate_chat_context(site_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session: Session) -> None:
+    session.info.pop("stale_chat_contexts", None)
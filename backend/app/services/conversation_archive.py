@@ -0,0 +1,110 @@
+import asyncio
+import gzip
+import json
+import os
+import shutil
+from datetime import date, datetime, timezone
+from pathlib import Path
+from uuid import UUID
+
+from ..config import settings
+from ..models.conversation import Conversation
+from ..models.user import PlanType
+
+SEGMENT_SUFFIX = ".ndjson.gz"
+
+
+def retention_days(plan: PlanType) -> int:
+    return {
+        PlanType.free: settings.RETENTION_DAYS_FREE,
+        PlanType.pro: settings.RETENTION_DAYS_PRO,
+        PlanType.business: settings.RETENTION_DAYS_BUSINESS,
+    }[plan]
+
+
+def serialize_conversation(conversation: Conversation) -> dict:
+    """JSON form of a conversation shared by exports and archive segments."""
+    return {
+        "id": str(conversation.id),
+        "visitor_id": conversation.visitor_id,
+        "language": conversation.language,
+        "created_at": _utc(conversation.created_at).isoformat() if conversation.created_at else None,
+        "ended_at": _utc(conversation.ended_at).isoformat() if conversation.ended_at else None,
+        "messages": conversation.messages or [],
+        "actions_triggered": conversation.actions_triggered or [],
+    }
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything is stored in UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class ConversationArchive:
+    """Append-only gzip NDJSON segments of archived conversations, laid out as <root>/<site_id>/<YYYY-MM>/.
+
+    Segments are written once (atomically, via rename) and never modified. A segment is named
+    after its first conversation, so re-archiving the same batch after a crash replaces it
+    instead of duplicating it.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def write_segment(self, site_id: UUID, month: str, rows: list[dict]) -> Path:
+        month_dir = self.root / str(site_id) / month
+        month_dir.mkdir(parents=True, exist_ok=True)
+        first = rows[0]
+        stamp = first["created_at"][:19].replace("-", "").replace(":", "")
+        path = month_dir / f"{stamp}-{first['id']}{SEGMENT_SUFFIX}"
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+                for row in rows:
+                    gz.write((json.dumps(row, ensure_ascii=False) + "\n").encode())
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp, path)
+        return path
+
+    def months(self, site_id: UUID, start: date | None = None, end: date | None = None) -> list[str]:
+        site_dir = self.root / str(site_id)
+        if not site_dir.is_dir():
+            return []
+        first = start.strftime("%Y-%m") if start else ""
+        last = end.strftime("%Y-%m") if end else "9999-99"
+        return sorted(p.name for p in site_dir.iterdir() if p.is_dir() and first <= p.name <= last)
+
+    def segments(self, site_id: UUID, month: str) -> list[Path]:
+        return sorted((self.root / str(site_id) / month).glob(f"*{SEGMENT_SUFFIX}"))
+
+    @staticmethod
+    def read_segment(path: Path) -> list[dict]:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    async def iter_conversations(
+        self,
+        site_id: UUID,
+        start: date | None = None,
+        end: date | None = None,
+        language: str | None = None,
+    ):
+        """Yield archived conversations oldest first, holding one segment in memory at a time."""
+        for month in await asyncio.to_thread(self.months, site_id, start, end):
+            for path in await asyncio.to_thread(self.segments, site_id, month):
+                for row in await asyncio.to_thread(self.read_segment, path):
+                    day = row["created_at"][:10]
+                    if start and day < start.isoformat():
+                        continue
+                    if end and day > end.isoformat():
+                        continue
+                    if language and row["language"] != language:
+                        continue
+                    yield row
+
+    def delete_site(self, site_id: UUID) -> None:
+        shutil.rmtree(self.root / str(site_id), ignore_errors=True)
+
+
+conversation_archive = ConversationArchive(settings.ARCHIVE_DIR)
@@ -0,0 +1,256 @@
+import asyncio
+import logging
+import time
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from ..config import settings
+from ..core.cache import register_cache
+from ..core.database import async_session_factory
+from ..models.conversation import Conversation
+from ..models.conversation_stats import ConversationDailyStats
+from .heavy_hitters import question_tracker
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationLogWriter:
+    """Buffers logged chat turns in a bounded queue and writes them in bulk from one background task.
+
+    Each turn carries only the messages and actions it adds. Turns of the same conversation in one
+    batch are appended together, and the append happens under a row lock, so turns written by
+    different API workers interleave instead of overwriting each other. The turns' increments to
+    the daily rollup are summed and applied in the same transaction; a conversation counts as new
+    in the rollup when this batch created its row.
+
+    Turns are flushed when a batch fills up or the oldest buffered turn has waited flush_interval
+    seconds. When the queue is full, new turns are dropped and counted rather than slowing replies.
+    """
+
+    def __init__(self, session_factory, max_queue: int, batch_size: int, flush_interval: float):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=max_queue)
+        self._task: asyncio.Task | None = None
+        self._inflight: asyncio.Task | None = None
+        self._collecting: list[dict] = []
+        self._pending: dict = {}  # conversation id -> rows enqueued but not yet flushed, oldest first
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def enqueue(self, turn: dict) -> bool:
+        try:
+            self._queue.put_nowait(turn)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self._pending.setdefault(turn["row"]["id"], []).append(turn["row"])
+        self.enqueued += 1
+        return True
+
+    def has_pending(self, conversation_id) -> bool:
+        """Whether this worker holds turns of the conversation that aren't written yet."""
+        return conversation_id in self._pending
+
+    def pending_rows(self, conversation_id) -> list[dict]:
+        """This worker's turns of the conversation that aren't written yet, oldest first."""
+        return list(self._pending.get(conversation_id, ()))
+
+    async def stop(self) -> None:
+        """Stop the flusher and write everything still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._inflight is not None:
+            await asyncio.gather(self._inflight, return_exceptions=True)
+            self._inflight = None
+        batch, self._collecting = self._collecting, []
+        await self._flush(batch)
+        while not self._queue.empty():
+            await self._flush(self._take(self.batch_size))
+
+    async def _run(self) -> None:
+        while True:
+            # Rows being collected live on the instance so stop() can flush them after cancelling us
+            self._collecting.append(await self._queue.get())
+            deadline = time.monotonic() + self.flush_interval
+            while len(self._collecting) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    self._collecting.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            self._collecting.extend(self._take(self.batch_size - len(self._collecting)))
+            batch, self._collecting = self._collecting, []
+            # Shielded so a shutdown mid-insert still finishes the batch; stop() waits for it
+            self._inflight = asyncio.create_task(self._flush(batch))
+            await asyncio.shield(self._inflight)
+            self._inflight = None
+
+    def _take(self, limit: int) -> list[dict]:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _flush(self, batch: list[dict]) -> None:
+        try:
+            await self._write(batch)
+        finally:
+            self._forget(batch)  # Written turns are forgotten already; failed ones are dropped
+
+    def _forget(self, batch: list[dict]) -> None:
+        for turn in batch:
+            rows = self._pending.get(turn["row"]["id"])
+            if rows is None:
+                continue
+            rows[:] = [row for row in rows if row is not turn["row"]]
+            if not rows:
+                del self._pending[turn["row"]["id"]]
+
+    async def _write(self, batch: list[dict]) -> None:
+        if not batch:
+            return
+        appended: dict = {}
+        for turn in batch:
+            row = turn["row"]
+            entry = appended.get(row["id"])
+            if entry is None:
+                appended[row["id"]] = {
+                    **row, "messages": list(row["messages"]), "actions_triggered": list(row["actions_triggered"])
+                }
+            else:
+                entry["messages"].extend(row["messages"])
+                entry["actions_triggered"].extend(row["actions_triggered"])
+                entry["language"] = row["language"]
+                entry["ended_at"] = row["ended_at"]
+
+        try:
+            async with self.session_factory() as db:
+                dialect_name = db.bind.dialect.name
+                created = await _append_conversations(db, list(appended.values()))
+
+                rollup: dict[tuple, dict] = {}
+                for turn in batch:
+                    row = turn["row"]
+                    key = (row["site_id"], turn["day"], row["language"])
+                    stats = rollup.setdefault(key, {"conversations": 0, "messages": 0, "actions": 0})
+                    if row["id"] in created:
+                        stats["conversations"] += 1
+                        created.discard(row["id"])
+                    stats["messages"] += turn["messages_added"]
+                    stats["actions"] += turn["actions_added"]
+                await db.execute(_increment_rollup(dialect_name, [
+                    {"site_id": site_id, "day": day, "language": language, **stats}
+                    for (site_id, day, language), stats in rollup.items()
+                ]))
+                await db.commit()
+                # Right away rather than after closing the session, so a reload doesn't count these turns twice
+                self._forget(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Failed to write {len(batch)} conversation turns: {e}")
+            return
+        for turn in batch:
+            question_tracker.record(turn["row"]["site_id"], turn["question"])
+        self.written += len(batch)
+        self.batches += 1
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+def _insert(dialect_name: str):
+    return sqlite.insert if dialect_name == "sqlite" else postgresql.insert
+
+
+async def _append_conversations(db, rows: list[dict]) -> set:
+    """Insert conversations that don't exist yet and append to the rest; returns the ids created here."""
+    result = await db.execute(
+        _insert(db.bind.dialect.name)(Conversation)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[Conversation.id])
+        .returning(Conversation.id)
+    )
+    created = set(result.scalars())
+    existing = [row for row in rows if row["id"] not in created]
+    if not existing:
+        return created
+
+    # Lock the rows so a concurrent append from another worker waits instead of being overwritten
+    current = {
+        conversation_id: (messages, actions)
+        for conversation_id, messages, actions in await db.execute(
+            select(Conversation.id, Conversation.messages, Conversation.actions_triggered)
+            .where(Conversation.id.in_([row["id"] for row in existing]))
+            .order_by(Conversation.id)
+            .with_for_update()
+        )
+    }
+    table = Conversation.__table__
+    params = [
+        {
+            "row_id": row["id"],
+            "new_messages": list(current[row["id"]][0] or []) + row["messages"],
+            "new_actions": list(current[row["id"]][1] or []) + row["actions_triggered"],
+            "new_language": row["language"],
+            "new_ended_at": row["ended_at"],
+        }
+        # A conversation deleted since its turn was logged is not resurrected
+        for row in existing
+        if row["id"] in current
+    ]
+    if params:
+        await db.execute(
+            update(table)
+            .where(table.c.id == bindparam("row_id"))
+            .values(
+                messages=bindparam("new_messages"),
+                actions_triggered=bindparam("new_actions"),
+                language=bindparam("new_language"),
+                ended_at=bindparam("new_ended_at"),
+            ),
+            params,
+        )
+    return created
+
+
+def _increment_rollup(dialect_name: str, rows: list[dict]):
+    stmt = _insert(dialect_name)(ConversationDailyStats).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[ConversationDailyStats.site_id, ConversationDailyStats.day, ConversationDailyStats.language],
+        set_={
+            "conversations": ConversationDailyStats.conversations + stmt.excluded.conversations,
+            "messages": ConversationDailyStats.messages + stmt.excluded.messages,
+            "actions": ConversationDailyStats.actions + stmt.excluded.actions,
+        },
+    )
+
+
+conversation_log = ConversationLogWriter(
+    async_session_factory,
+    max_queue=settings.CONVERSATION_LOG_MAX_QUEUE,
+    batch_size=settings.CONVERSATION_LOG_BATCH_SIZE,
+    flush_interval=settings.CONVERSATION_LOG_FLUSH_INTERVAL,
+)
+register_cache("conversation_log", conversation_log)
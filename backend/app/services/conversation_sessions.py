@@ -0,0 +1,156 @@
+import hashlib
+import hmac
+import secrets
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..core.cache import LRUCache, register_cache
+from ..models.conversation import Conversation
+from .conversation_log import conversation_log
+
+# conversation_id -> {"id", "site_id", "messages", "language", "actions_triggered", "ended_at", "stored"}; the
+# conversations table is the source of truth. Each API worker keeps its own cache. Replies tell the
+# widget when the conversation last changed and the widget sends that back, so a cached session
+# older than it is reloaded: another worker has written a turn since.
+_sessions = LRUCache(max_entries=settings.CONVERSATION_SESSION_CACHE_SIZE, ttl=settings.CONVERSATION_SESSION_TTL)
+register_cache("conversation_sessions", _sessions)
+
+
+async def get_session(
+    db: AsyncSession, site_id: UUID, conversation_id: UUID | None, seen_at: datetime | None = None
+) -> dict:
+    """Return the site's conversation with this id, or start a new one if it is unknown.
+
+    `seen_at` is when the conversation last changed as of the widget's latest reply. "stored" says
+    whether the conversation's earlier turns can be read back from the database by any worker;
+    until then the widget keeps sending its history.
+    """
+    if conversation_id is not None:
+        session = _sessions.get(conversation_id)
+        if session is not None and session["site_id"] == site_id and not await _stale(db, session, seen_at):
+            if not session["stored"] and session["messages"] and not conversation_log.has_pending(session["id"]):
+                session["stored"] = True  # Our buffered turns have been flushed since
+            return session
+
+        result = await db.execute(select(Conversation).where(Conversation.id == conversation_id))
+        conversation = result.scalar_one_or_none()
+        if conversation is not None and conversation.site_id == site_id:
+            session = _new_session(conversation.id, site_id)
+            session.update(
+                messages=list(conversation.messages or []),
+                language=conversation.language,
+                actions_triggered=list(conversation.actions_triggered or []),
+                ended_at=_aware(conversation.ended_at),
+                stored=True,
+            )
+            return _with_pending(session, seen_at)
+        if conversation is None and _issued_for(conversation_id, site_id):
+            # Not stored yet: the worker that started it may still be buffering its first turn.
+            # Keep the id so both workers' turns land in the same conversation; until the row
+            # exists the reply is built from the history the widget sends.
+            return _with_pending(_new_session(conversation_id, site_id), seen_at)
+
+    # Ids are only adopted when this server issued them for the site
+    return _new_session(_issue_id(site_id), site_id)
+
+
+def _new_session(conversation_id: UUID, site_id: UUID) -> dict:
+    session = {
+        "id": conversation_id,
+        "site_id": site_id,
+        "messages": [],
+        "language": "en",
+        "actions_triggered": [],
+        "ended_at": None,
+        "stored": False,
+    }
+    _sessions.set(conversation_id, session)
+    return session
+
+
+def _with_pending(session: dict, seen_at: datetime | None) -> dict:
+    """Add the turns this worker has logged but not written yet to a session loaded from the database."""
+    for row in conversation_log.pending_rows(session["id"]):
+        session["messages"].extend(row["messages"])
+        session["actions_triggered"].extend(row["actions_triggered"])
+        session["language"] = row["language"]
+        session["ended_at"] = row["ended_at"]
+        session["stored"] = False
+    if seen_at is not None and (session["ended_at"] is None or seen_at > session["ended_at"]):
+        session["stored"] = False  # Another worker's latest turn is still buffered there
+    return session
+
+
+async def _stale(db: AsyncSession, session: dict, seen_at: datetime | None) -> bool:
+    """Whether another worker has written a turn newer than any this worker has seen or written."""
+    if seen_at is None:
+        # A widget that doesn't send seen_at yet: check the stored row instead
+        result = await db.execute(select(Conversation.ended_at).where(Conversation.id == session["id"]))
+        seen_at = _aware(result.scalar_one_or_none())
+        if seen_at is None:
+            return False
+    return session["ended_at"] is None or _aware(seen_at) > session["ended_at"]
+
+
+def _issue_id(site_id: UUID) -> UUID:
+    nonce = secrets.token_bytes(8)
+    return UUID(bytes=nonce + _signature(site_id, nonce))
+
+
+def _issued_for(conversation_id: UUID, site_id: UUID) -> bool:
+    nonce, signature = conversation_id.bytes[:8], conversation_id.bytes[8:]
+    return hmac.compare_digest(signature, _signature(site_id, nonce))
+
+
+def _signature(site_id: UUID, nonce: bytes) -> bytes:
+    return hmac.new(settings.JWT_SECRET.encode(), site_id.bytes + nonce, hashlib.sha256).digest()[:8]
+
+
+def _aware(value: datetime | None) -> datetime | None:
+    # SQLite hands back naive datetimes; stored times are UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def append_turn(session: dict, user_message: str, ai_response: dict) -> dict:
+    """Record a turn on the session and return it for the conversation log: the messages and
+    actions to append to the conversation row, plus the increments for the daily rollup."""
+    now = datetime.now(timezone.utc)
+    actions = ai_response.get("actions", [])
+    language = ai_response.get("language", "en")
+    # The reply carries the turn's time, language and action count so the rollup can be rebuilt
+    # with the same keys the writer uses
+    messages = [
+        {"role": "user", "content": user_message},
+        {
+            "role": "assistant",
+            "content": ai_response["text"],
+            "at": now.isoformat(),
+            "language": language,
+            "actions_added": len(actions),
+        },
+    ]
+    session["messages"].extend(messages)
+    session["language"] = language
+    session["actions_triggered"].extend(actions)
+    session["ended_at"] = now
+    return {
+        "row": {
+            "id": session["id"],
+            "site_id": session["site_id"],
+            "visitor_id": "anonymous",
+            "messages": messages,
+            "language": session["language"],
+            "actions_triggered": list(actions),
+            "ended_at": now,
+        },
+        "day": now.date(),
+        "question": user_message,
+        "messages_added": 2,
+        "actions_added": len(actions),
+    }
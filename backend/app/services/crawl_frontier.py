@@ -0,0 +1,163 @@
+import gzip
+import hashlib
+import logging
+import re
+import xml.etree.ElementTree as ET
+from collections import deque
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "VoiceAI-Crawler/1.0"
+
+TRACKING_PARAMS = {"gclid", "fbclid", "yclid", "msclkid", "mc_cid", "mc_eid", "_ga", "_gl", "ref", "source"}
+
+SKIP_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".ico", ".bmp",
+    ".zip", ".rar", ".gz", ".tar", ".mp3", ".mp4", ".webm", ".avi", ".mov",
+    ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".css", ".js", ".json", ".xml", ".txt",
+)
+
+MAX_SITEMAPS = 10
+MAX_PATH_LENGTH = 500
+
+
+def _bare_host(host: str | None) -> str:
+    host = (host or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def normalize_url(url: str, site_url: str) -> str | None:
+    """Canonical absolute form of a same-site page URL, or None for off-site and non-page URLs.
+
+    Drops fragments, tracking parameters and trailing slashes, sorts the remaining query
+    parameters, and rewrites www/non-www variants onto the site's own origin.
+    """
+    try:
+        parts = urlsplit(urljoin(site_url + "/", url.strip()))
+    except ValueError:
+        return None
+    if parts.scheme not in ("http", "https"):
+        return None
+    site = urlsplit(site_url)
+    if _bare_host(parts.hostname) != _bare_host(site.hostname):
+        return None
+
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    if path.lower().endswith(SKIP_EXTENSIONS):
+        return None
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ))
+    # Pages are stored by path and query in a 500-character column
+    if len(path) + len(query) >= MAX_PATH_LENGTH:
+        return None
+    return urlunsplit((site.scheme, site.netloc, path, query, ""))
+
+
+def site_path(url: str) -> str:
+    """The path-and-query form pages are stored under ("/about", "/blog?page=2")."""
+    parts = urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+class CrawlFrontier:
+    """Breadth-first queue of same-site URLs with a depth limit, robots.txt rules and a compact visited set.
+
+    Visited URLs are kept as 8-byte digests, so even very large sites cost little memory.
+    """
+
+    def __init__(self, max_depth: int, robots: RobotFileParser | None = None):
+        self.max_depth = max_depth
+        self.robots = robots
+        self._queue: deque[tuple[str, int]] = deque()
+        self._seen: set[bytes] = set()
+        self.disallowed = 0
+
+    @staticmethod
+    def _key(url: str) -> bytes:
+        return hashlib.blake2b(url.encode(), digest_size=8).digest()
+
+    def add(self, url: str | None, depth: int) -> bool:
+        """Queue a normalized URL unless it is too deep, already seen or disallowed by robots.txt."""
+        if url is None or depth > self.max_depth:
+            return False
+        key = self._key(url)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        if self.robots is not None and not self.robots.can_fetch(USER_AGENT, url):
+            self.disallowed += 1
+            return False
+        self._queue.append((url, depth))
+        return True
+
+    def seen(self, url: str) -> bool:
+        return self._key(url) in self._seen
+
+    def mark_seen(self, url: str) -> None:
+        self._seen.add(self._key(url))
+
+    def next_level(self, limit: int) -> list[tuple[str, int]]:
+        """Dequeue up to `limit` URLs, all from the shallowest depth still queued."""
+        batch = []
+        while self._queue and len(batch) < limit:
+            if batch and self._queue[0][1] != batch[0][1]:
+                break
+            batch.append(self._queue.popleft())
+        return batch
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+
+async def load_robots(client: httpx.AsyncClient, site_url: str) -> RobotFileParser:
+    """Fetch and parse robots.txt; a missing or unreachable file allows everything."""
+    robots = RobotFileParser(f"{site_url}/robots.txt")
+    try:
+        response = await client.get(f"{site_url}/robots.txt")
+    except httpx.HTTPError as e:
+        logger.info(f"robots.txt unavailable for {site_url}: {e}")
+        robots.allow_all = True
+        return robots
+    if response.status_code >= 400:
+        robots.allow_all = True
+    else:
+        robots.parse(response.text.splitlines())
+    return robots
+
+
+async def sitemap_urls(client: httpx.AsyncClient, site_url: str, robots: RobotFileParser, limit: int) -> list[str]:
+    """Page URLs listed in the site's sitemaps (from robots.txt, else /sitemap.xml), nested indexes included."""
+    pending = deque(robots.site_maps() or [f"{site_url}/sitemap.xml"])
+    fetched = 0
+    urls: list[str] = []
+    while pending and fetched < MAX_SITEMAPS and len(urls) < limit:
+        sitemap = pending.popleft()
+        fetched += 1
+        try:
+            response = await client.get(sitemap)
+            response.raise_for_status()
+            body = response.content
+            if sitemap.endswith(".gz") or body[:2] == b"\x1f\x8b":
+                body = gzip.decompress(body)
+            root = ET.fromstring(body)
+        except (httpx.HTTPError, OSError, ET.ParseError) as e:
+            logger.info(f"Skipping sitemap {sitemap}: {e}")
+            continue
+
+        for element in root.iter():
+            if not element.tag.endswith("loc") or not element.text:
+                continue
+            loc = element.text.strip()
+            if root.tag.endswith("sitemapindex"):
+                pending.append(loc)
+            elif (url := normalize_url(loc, site_url)) is not None:
+                urls.append(url)
+    return urls[:limit]
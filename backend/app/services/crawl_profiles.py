@@ -0,0 +1,118 @@
+from dataclasses import asdict, dataclass, fields, replace
+from urllib.parse import urlsplit
+
+from ..config import settings
+
+# Analytics, ads, chat and session-replay hosts that never contribute page content
+TRACKER_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "googlesyndication.com", "doubleclick.net",
+    "googleadservices.com", "facebook.net", "connect.facebook.com", "hotjar.com", "clarity.ms",
+    "mc.yandex.ru", "segment.io", "segment.com", "mixpanel.com", "amplitude.com",
+    "intercom.io", "intercomcdn.com", "crisp.chat", "tawk.to", "jivosite.com", "drift.com",
+    "zdassets.com", "zopim.com", "livechatinc.com", "tiktok.com", "snap.licdn.com", "ads-twitter.com",
+)
+
+RESOURCE_TYPES = {
+    "document", "stylesheet", "image", "media", "font", "script", "texttrack", "xhr", "fetch",
+    "eventsource", "websocket", "manifest", "other",
+}
+THIRD_PARTY_POLICIES = ("allow", "known", "block")
+READINESS_MODES = ("dom_stable", "content", "networkidle", "load")
+FETCH_MODES = ("auto", "static", "browser")
+
+
+@dataclass(frozen=True)
+class CrawlProfile:
+    """How the browser loads pages during a crawl: what it blocks and when a page counts as ready.
+
+    third_party is "allow" (load everything), "known" (abort requests to TRACKER_HOSTS) or
+    "block" (abort every request off the site's own domain except allowed_hosts). Readiness is
+    "dom_stable" (no DOM mutations for stability_ms), "content" (the same, once the main element
+    has text) or one of Playwright's "networkidle"/"load"; the first two give up waiting after
+    ready_timeout_ms and extract whatever has rendered.
+    """
+
+    name: str
+    block_resource_types: frozenset = frozenset()
+    third_party: str = "allow"
+    allowed_hosts: tuple = ()
+    readiness: str = "networkidle"
+    stability_ms: int = 500
+    ready_timeout_ms: int = 5000
+    fetch_mode: str | None = None  # None follows CRAWL_FETCH_MODE
+
+    def blocks(self, resource_type: str, url: str, site_host: str) -> bool:
+        if resource_type in self.block_resource_types:
+            return True
+        if self.third_party == "allow":
+            return False
+        host = (urlsplit(url).hostname or "").lower()
+        if _on_domain(host, site_host) or any(_on_domain(host, allowed) for allowed in self.allowed_hosts):
+            return False
+        if self.third_party == "block":
+            return True
+        return any(_on_domain(host, tracker) for tracker in TRACKER_HOSTS)
+
+    @property
+    def intercepts(self) -> bool:
+        return bool(self.block_resource_types) or self.third_party != "allow"
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["block_resource_types"] = sorted(self.block_resource_types)
+        data["allowed_hosts"] = list(self.allowed_hosts)
+        return data
+
+
+def _on_domain(host: str, domain: str) -> bool:
+    domain = domain.lower().removeprefix("www.")
+    return host == domain or host.endswith("." + domain)
+
+
+PROFILES = {
+    # Skip heavy assets and trackers; wait for the main content to render and settle
+    "default": CrawlProfile(
+        name="default",
+        block_resource_types=frozenset({"image", "media", "font", "texttrack", "manifest"}),
+        third_party="known",
+        readiness="content",
+    ),
+    # Only the site's own documents, scripts, styles and API calls
+    "lean": CrawlProfile(
+        name="lean",
+        block_resource_types=frozenset({"image", "media", "font", "texttrack", "manifest", "eventsource", "websocket"}),
+        third_party="block",
+        readiness="dom_stable",
+        stability_ms=300,
+        ready_timeout_ms=3000,
+    ),
+    # Load everything and wait for the network to go quiet, as crawls used to
+    "full": CrawlProfile(name="full"),
+}
+
+
+def resolve_profile(overrides: dict | None) -> CrawlProfile:
+    """The site's crawl profile: a named base profile (CRAWL_PROFILE by default) with per-site overrides applied.
+
+    Unknown keys and invalid values are ignored, so a stale override never breaks a crawl.
+    """
+    overrides = overrides or {}
+    profile = PROFILES.get(overrides.get("profile"), PROFILES.get(settings.CRAWL_PROFILE, PROFILES["default"]))
+    changes = {}
+    for field in fields(CrawlProfile):
+        value = overrides.get(field.name)
+        if field.name == "name" or value is None:
+            continue
+        if field.name == "block_resource_types":
+            changes[field.name] = frozenset(t for t in value if t in RESOURCE_TYPES)
+        elif field.name == "allowed_hosts":
+            changes[field.name] = tuple(str(h).lower() for h in value)
+        elif field.name == "third_party" and value in THIRD_PARTY_POLICIES:
+            changes[field.name] = value
+        elif field.name == "readiness" and value in READINESS_MODES:
+            changes[field.name] = value
+        elif field.name == "fetch_mode" and value in FETCH_MODES:
+            changes[field.name] = value
+        elif field.name in ("stability_ms", "ready_timeout_ms") and isinstance(value, int):
+            changes[field.name] = value
+    return replace(profile, **changes)
@@ -0,0 +1,94 @@
+import logging
+import time
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models.crawl_progress import CrawlProgress
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = (
+    "urls_discovered",
+    "pages_fetched",
+    "static_fetches",
+    "browser_fetches",
+    "pages_saved",
+    "pages_unchanged",
+    "sections_reused",
+    "sections_total",
+    "sections_summarized",
+)
+FINAL_STAGES = ("completed", "failed")
+
+
+class CrawlProgressReporter:
+    """Publishes a running crawl's stage and counters to crawl_progress.
+
+    Writes go through their own short sessions so progress is visible while the crawl's own
+    transaction is still open. Counter updates are throttled to one write per `min_interval`;
+    stage changes are always written. Progress is best effort and never fails the crawl.
+    """
+
+    def __init__(self, session_factory, site_id: UUID, min_interval: float = settings.CRAWL_PROGRESS_WRITE_INTERVAL):
+        self.session_factory = session_factory
+        self.site_id = site_id
+        self.min_interval = min_interval
+        self.stage = "crawling"
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.error: str | None = None
+        self.started_at = datetime.now(timezone.utc)
+        self.finished_at: datetime | None = None
+        self._last_write = 0.0
+
+    async def start(self) -> None:
+        await self.set_stage("crawling")
+
+    async def set_stage(self, stage: str) -> None:
+        self.stage = stage
+        await self._publish(force=True)
+
+    async def add(self, **deltas: int) -> None:
+        for name, delta in deltas.items():
+            self.counts[name] += delta
+        await self._publish()
+
+    async def finish(self, error: str | None = None) -> None:
+        self.error = error[:500] if error else None
+        self.finished_at = datetime.now(timezone.utc)
+        await self.set_stage("failed" if error else "completed")
+
+    async def _publish(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_write < self.min_interval:
+            return
+        self._last_write = now
+        values = {
+            "site_id": self.site_id,
+            "stage": self.stage,
+            **self.counts,
+            "error": self.error,
+            "started_at": self.started_at,
+            "updated_at": datetime.now(timezone.utc),
+            "finished_at": self.finished_at,
+        }
+        try:
+            async with self.session_factory() as db:
+                insert = sqlite.insert if db.bind.dialect.name == "sqlite" else postgresql.insert
+                stmt = insert(CrawlProgress).values(values)
+                await db.execute(stmt.on_conflict_do_update(
+                    index_elements=[CrawlProgress.site_id],
+                    set_={k: stmt.excluded[k] for k in values if k != "site_id"},
+                ))
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to publish crawl progress for site {self.site_id}: {e}")
+
+
+async def get_crawl_progress(db: AsyncSession, site_id: UUID) -> CrawlProgress | None:
+    result = await db.execute(select(CrawlProgress).where(CrawlProgress.site_id == site_id))
+    return result.scalar_one_or_none()
@@ -1,124 +1,488 @@
+import asyncio
 import logging
-from urllib.parse import urljoin, urlparse
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
 
+import httpx
 from playwright.async_api import async_playwright
 
-logger = logging.getLogger(__name__)
+from ..config import settings
+from .crawl_frontier import USER_AGENT, CrawlFrontier, load_robots, normalize_url, site_path, sitemap_urls
+from .crawl_profiles import CrawlProfile, resolve_profile
+from .html_extract import HtmlDocument, extract_page_data, has_content, needs_browser, page_links
 
+logger = logging.getLogger(__name__)
 
-async def crawl_site(site_url: str, max_pages: int = 50) -> list[dict]:
-    pages = []
-    visited = set()
-    site_url = site_url.rstrip("/")
-    base_domain = urlparse(site_url).netloc
+PAGE_LINKS_JS = """() => {
+    // Navigation links first so the most important pages are crawled before the cap is reached
+    const anchors = [
+        ...document.querySelectorAll('nav a[href], header a[href], [role="navigation"] a[href], footer a[href]'),
+        ...document.querySelectorAll('a[href]'),
+    ];
+    const links = new Set();
+    anchors.forEach(a => {
+        const href = a.getAttribute('href');
+        // Skip same-page anchors and non-HTTP links
+        if (!href || href.startsWith('#') || /^(javascript|mailto|tel):/i.test(href)) return;
+        links.add(a.href);
+    });
+    const canonical = document.querySelector('link[rel="canonical"]');
+    return {links: [...links], canonical: canonical ? canonical.href : null};
+}"""
+
+# Tracks DOM mutations from its first call; true once the DOM has been quiet for quietMs
+# and the main element holds at least minText characters
+READY_JS = """({quietMs, minText}) => {
+    if (!window.__crawlReady) {
+        const state = {last: performance.now()};
+        new MutationObserver(() => { state.last = performance.now(); })
+            .observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+        window.__crawlReady = state;
+    }
+    const main = document.querySelector('main, [role="main"]') || document.body;
+    const textLength = main ? main.innerText.trim().length : 0;
+    return textLength >= minText && performance.now() - window.__crawlReady.last >= quietMs;
+}"""
+
+HAS_CONTENT_JS = """() => {
+    const main = document.querySelector('main') || document.body;
+    const text = main.innerText.trim();
+    // If page has very little text or looks like an error page, skip
+    if (text.length < 100) return false;
+    // Check for common 404 indicators
+    const lower = text.toLowerCase();
+    if (lower.includes('404') && lower.includes('not found')) return false;
+    if (lower.includes('page not found')) return false;
+    if (lower.includes('this page could not be found')) return false;
+    return true;
+}"""
+
+
+class PagePool:
+    """Browser pages leased to concurrent fetches: at most `size` pages in total and `per_host` per host.
+
+    Pages are created lazily and reused between fetches. With `isolate` each page gets its own
+    browser context (separate cookies and cache) instead of sharing one. Requests the crawl
+    `profile` blocks are aborted at the context level, before they reach the network.
+    """
+
+    def __init__(self, browser, size: int, per_host: int, isolate: bool = False,
+                 profile: CrawlProfile | None = None, site_host: str = ""):
+        self.browser = browser
+        self.size = size
+        self.isolate = isolate
+        self.profile = profile
+        self.site_host = site_host
+        self.blocked_requests = 0
+        self._per_host = per_host
+        self._host_limits: dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(self._per_host))
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._created = 0
+        self._shared_context = None
+        self._contexts = []
+
+    @asynccontextmanager
+    async def page(self, url: str):
+        async with self._host_limits[urlparse(url).netloc]:
+            page = await self._acquire()
+            try:
+                yield page
+            finally:
+                # A closed page's slot goes back as None, so a fetch waiting for a page opens a new one
+                self._idle.put_nowait(None if page.is_closed() else page)
+
+    async def _acquire(self):
+        if self._idle.empty() and self._created < self.size:
+            self._created += 1
+            return await self._new_page()
+        page = await self._idle.get()
+        return page if page is not None else await self._new_page()
+
+    async def _new_page(self):
+        try:
+            page = await (await self._context()).new_page()
+        except Exception:
+            self._idle.put_nowait(None)
+            raise
+        page.set_default_timeout(30000)
+        return page
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            user_agent="VoiceAI-Crawler/1.0",
-            viewport={"width": 1280, "height": 720},
+    async def _context(self):
+        if self.isolate or self._shared_context is None:
+            context = await self.browser.new_context(
+                user_agent=USER_AGENT,
+                viewport={"width": 1280, "height": 720},
+            )
+            if self.profile is not None and self.profile.intercepts:
+                await context.route("**/*", self._route)
+            self._contexts.append(context)
+            if not self.isolate:
+                self._shared_context = context
+            return context
+        return self._shared_context
+
+    async def _route(self, route) -> None:
+        request = route.request
+        # Never abort a top-level navigation, even if the site redirects to another domain
+        is_page = request.is_navigation_request() and request.frame.parent_frame is None
+        if not is_page and self.profile.blocks(request.resource_type, request.url, self.site_host):
+            self.blocked_requests += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def close(self) -> None:
+        for context in self._contexts:
+            try:
+                await context.close()
+            except Exception as e:
+                logger.warning(f"Failed to close browser context: {e}")
+
+
+def _page_timeout(deadline: float, limit: float) -> float:
+    """Playwright timeout in ms: the per-page limit, cut short by what is left of the crawl budget."""
+    return max(min(limit, deadline - time.monotonic()), 0.1) * 1000
+
+
+class _NeedsBrowser(Exception):
+    """Static HTML was fetched but can't be trusted without rendering."""
+
+
+class PageFetcher:
+    """Fetches pages for one crawl, over plain HTTP when possible and through a browser when needed.
+
+    In "auto" mode each page is first fetched with httpx and extracted from its static HTML;
+    SPA shells, thin pages and requests refused to non-browser clients are retried in Playwright.
+    "static" never uses a browser and "browser" always does. Chromium is launched on first use,
+    so a fully server-rendered site never starts it. Counts of each kind of fetch are kept.
+
+    `previous` maps page paths to what the last crawl stored for them (etag, last_modified, links,
+    section headings). Static fetches of those pages are conditional; a 304 yields a page marked
+    "not_modified" with the stored links instead of re-extracting it.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        profile: CrawlProfile,
+        site_host: str,
+        deadline: float,
+        progress=None,
+        previous: dict[str, dict] | None = None,
+    ):
+        self.client = client
+        self.previous = previous or {}
+        self.profile = profile
+        self.site_host = site_host
+        self.mode = profile.fetch_mode or settings.CRAWL_FETCH_MODE
+        self.deadline = deadline
+        self.progress = progress
+        self.static_fetches = 0
+        self.browser_fetches = 0
+        self.not_modified = 0
+        self._playwright = None
+        self._browser = None
+        self._pool: PagePool | None = None
+        self._lock = asyncio.Lock()
+        # Static fetches honour the same limits as the browser pool
+        self._static_limit = asyncio.Semaphore(settings.CRAWL_CONCURRENCY)
+        self._host_limits: dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(settings.CRAWL_PER_HOST_CONCURRENCY)
         )
 
-        page = await context.new_page()
-        page.set_default_timeout(30000)
+    async def fetch(self, url: str, path: str, check_content: bool = True) -> tuple[dict | None, dict] | None:
+        """Load one page and extract it with its links.
 
-        # Load homepage
+        Returns None when the page fails to load or errors, else (page_data, links) where page_data
+        is None for soft 404s and empty pages, whose links are still followed. The homepage is
+        fetched with `check_content` off so a sparse landing page still yields its links.
+        """
+        if self.mode != "browser":
+            try:
+                result = await self._fetch_static(url, path, check_content)
+            except _NeedsBrowser as e:
+                if self.mode == "static":
+                    logger.info(f"Skipping {url} ({e}; browser fetches disabled)")
+                    return None
+                logger.info(f"Rendering {url} in the browser ({e})")
+            else:
+                if result is not None:
+                    await self._count(static_fetches=1)
+                return result
+
+        result = await self._fetch_browser(url, path, check_content)
+        if result is not None:
+            await self._count(browser_fetches=1)
+        return result
+
+    async def _count(self, **deltas: int) -> None:
+        for name, delta in deltas.items():
+            setattr(self, name, getattr(self, name) + delta)
+        if self.progress:
+            await self.progress.add(pages_fetched=1, **deltas)
+
+    async def _fetch_static(self, url: str, path: str, check_content: bool) -> tuple[dict | None, dict] | None:
+        previous = self.previous.get(path)
+        headers = {}
+        if previous and previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous and previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
         try:
-            response = await page.goto(site_url, wait_until="networkidle")
-        except Exception as e:
-            logger.error(f"Failed to load homepage {site_url}: {e}")
-            await browser.close()
-            return pages
-
-        # Extract homepage content first
-        homepage_data = await _extract_page_data(page, "/")
-        homepage_fingerprint = ""
-        if homepage_data["sections"]:
-            pages.append(homepage_data)
-            # Create a fingerprint to detect duplicate pages (soft 404s that render homepage)
-            homepage_fingerprint = _content_fingerprint(homepage_data["sections"])
-        visited.add("/")
-
-        # Collect internal links from nav/header/footer
-        nav_links = await page.evaluate(
-            """() => {
-            const links = new Set();
-            const origin = window.location.origin;
-            document.querySelectorAll('nav a, header a, [role="navigation"] a, footer a').forEach(a => {
-                const href = a.getAttribute('href');
-                if (!href) return;
-                // Skip hash-only links (same-page anchors)
-                if (href.startsWith('#')) return;
-                // Skip javascript: links
-                if (href.startsWith('javascript:')) return;
-                try {
-                    const url = new URL(href, origin);
-                    if (url.origin === origin && url.pathname !== '/') {
-                        links.add(url.pathname);
-                    }
-                } catch(e) {}
-            });
-            return [...links];
-        }"""
+            async with self._static_limit, self._host_limits[urlparse(url).netloc]:
+                response = await self.client.get(
+                    url,
+                    headers=headers,
+                    timeout=max(min(settings.CRAWL_PAGE_TIMEOUT, self.deadline - time.monotonic()), 0.1),
+                )
+        except httpx.HTTPError as e:
+            raise _NeedsBrowser(f"HTTP fetch failed: {e!r}")
+
+        if response.status_code == 304 and previous:
+            self.not_modified += 1
+            return {
+                "url": path,
+                "not_modified": True,
+                "etag": response.headers.get("etag", previous.get("etag")),
+                "last_modified": response.headers.get("last-modified", previous.get("last_modified")),
+                "fingerprint": _content_fingerprint(previous["sections"]),
+            }, previous["links"]
+
+        if response.status_code == 403:
+            raise _NeedsBrowser("HTTP 403")
+        if response.status_code >= 400:
+            logger.info(f"Skipping {url} (HTTP {response.status_code})")
+            return None
+        if "html" not in response.headers.get("content-type", "text/html"):
+            logger.info(f"Skipping {url} (not HTML)")
+            return None
+
+        # Parsing is CPU-bound; keep it off the event loop so other fetches' timeouts stay accurate
+        page_data, links = await asyncio.to_thread(
+            _extract_static, response.text, str(response.url), path, check_content
         )
-
-        # Crawl sub-pages, but skip ones that are empty/404
-        for link in nav_links[:max_pages]:
-            if link in visited:
-                continue
-            visited.add(link)
-
-            full_url = f"{site_url}{link}"
+        # Validators are kept only for statically extracted pages: a 304 on a rendered page
+        # says nothing about the content its scripts load
+        if page_data is not None:
+            page_data["etag"] = response.headers.get("etag")
+            page_data["last_modified"] = response.headers.get("last-modified")
+        return page_data, links
+
+    async def _fetch_browser(self, url: str, path: str, check_content: bool) -> tuple[dict | None, dict] | None:
+        pool = await self._browser_pool()
+        # DOM-based readiness starts from DOMContentLoaded and waits in _wait_ready instead
+        wait_until = self.profile.readiness if self.profile.readiness in ("networkidle", "load") else "domcontentloaded"
+        async with pool.page(url) as page:
             try:
-                resp = await page.goto(full_url, wait_until="networkidle", timeout=20000)
+                resp = await page.goto(
+                    url, wait_until=wait_until, timeout=_page_timeout(self.deadline, settings.CRAWL_PAGE_TIMEOUT)
+                )
             except Exception as e:
-                logger.warning(f"Failed to load {full_url}: {e}")
-                continue
+                logger.warning(f"Failed to load {url}: {e}")
+                return None
+
+            if self.profile.readiness in ("dom_stable", "content") and not (resp and resp.status >= 400):
+                await self._wait_ready(page, url)
 
             # Skip 404/error pages
             if resp and resp.status >= 400:
-                logger.info(f"Skipping {full_url} (HTTP {resp.status})")
-                continue
-
-            # Check if page has real content (not a soft 404 or empty page)
-            has_content = await page.evaluate(
-                """() => {
-                const main = document.querySelector('main') || document.body;
-                const text = main.innerText.trim();
-                // If page has very little text or looks like an error page, skip
-                if (text.length < 100) return false;
-                // Check for common 404 indicators
-                const lower = text.toLowerCase();
-                if (lower.includes('404') && lower.includes('not found')) return false;
-                if (lower.includes('page not found')) return false;
-                if (lower.includes('this page could not be found')) return false;
-                return true;
-            }"""
-            )
+                logger.info(f"Skipping {url} (HTTP {resp.status})")
+                return None
 
-            if not has_content:
-                logger.info(f"Skipping {full_url} (no meaningful content)")
-                continue
-
-            # Check if this sub-page is substantially different from homepage
-            page_data = await _extract_page_data(page, link)
-            if not page_data["sections"]:
-                continue
+            try:
+                links = await page.evaluate(PAGE_LINKS_JS)
+                # Check if page has real content (not a soft 404 or empty page)
+                if check_content and not await page.evaluate(HAS_CONTENT_JS):
+                    logger.info(f"Skipping {url} (no meaningful content)")
+                    return None, links
 
-            # Skip if page content is same as homepage (soft 404 / SPA fallback)
-            page_fingerprint = _content_fingerprint(page_data["sections"])
-            if homepage_fingerprint and page_fingerprint == homepage_fingerprint:
-                logger.info(f"Skipping {full_url} (duplicate of homepage)")
-                continue
+                page_data = await _extract_page_data(page, path)
+            except Exception as e:
+                logger.warning(f"Failed to extract {url}: {e}")
+                return None
 
-            pages.append(page_data)
+        if check_content and not page_data["sections"]:
+            return None, links
+        return page_data, links
 
-        await browser.close()
+    async def _wait_ready(self, page, url: str) -> None:
+        """Wait for the page to settle; on timeout extract whatever has rendered so far."""
+        try:
+            await page.wait_for_function(
+                READY_JS,
+                arg={
+                    "quietMs": self.profile.stability_ms,
+                    "minText": 100 if self.profile.readiness == "content" else 0,
+                },
+                polling=100,
+                timeout=_page_timeout(self.deadline, self.profile.ready_timeout_ms / 1000),
+            )
+        except Exception as e:
+            logger.info(f"{url} did not settle, extracting as rendered: {e}")
+
+    @property
+    def blocked_requests(self) -> int:
+        return self._pool.blocked_requests if self._pool is not None else 0
+
+    async def _browser_pool(self) -> PagePool:
+        async with self._lock:
+            if self._pool is None:
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+                self._pool = PagePool(
+                    self._browser,
+                    size=settings.CRAWL_CONCURRENCY,
+                    per_host=settings.CRAWL_PER_HOST_CONCURRENCY,
+                    isolate=settings.CRAWL_ISOLATE_CONTEXTS,
+                    profile=self.profile,
+                    site_host=self.site_host,
+                )
+        return self._pool
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+
+def _extract_static(html: str, url: str, path: str, check_content: bool) -> tuple[dict | None, dict]:
+    doc = HtmlDocument(html, url)
+    reason = needs_browser(doc, settings.CRAWL_STATIC_MIN_TEXT)
+    if reason:
+        raise _NeedsBrowser(reason)
+    links = page_links(doc)
+    if check_content and not has_content(doc):
+        logger.info(f"Skipping {url} (no meaningful content)")
+        return None, links
+    page_data = extract_page_data(doc, path)
+    if check_content and not page_data["sections"]:
+        return None, links
+    return page_data, links
+
+
+async def crawl_site(
+    site_url: str,
+    max_pages: int = 50,
+    progress=None,
+    profile: CrawlProfile | None = None,
+    previous: dict[str, dict] | None = None,
+) -> list[dict]:
+    """Crawl a site breadth-first from its homepage, up to `max_pages` pages and CRAWL_MAX_DEPTH links deep.
+
+    The frontier is seeded with the homepage's links and the site's sitemap, respects robots.txt,
+    and follows every internal link in normalized form. Each depth level is fetched concurrently
+    by a PageFetcher (see CRAWL_FETCH_MODE), but results keep discovery order so repeated crawls
+    are stable. The whole crawl stops after CRAWL_TIME_BUDGET seconds, keeping what it has.
+    `progress`, if given, is a CrawlProgressReporter that receives discovered/fetched counts.
+    `profile` controls resource blocking and readiness in the browser (CRAWL_PROFILE by default).
+    `previous` enables conditional re-fetching (see PageFetcher); every returned page carries
+    its `links` so they can be stored for the next crawl.
+    """
+    pages = []
+    site_url = site_url.rstrip("/")
+    profile = profile or resolve_profile(None)
+    deadline = time.monotonic() + settings.CRAWL_TIME_BUDGET
+
+    async with httpx.AsyncClient(
+        headers={"User-Agent": USER_AGENT}, timeout=settings.CRAWL_PAGE_TIMEOUT, follow_redirects=True
+    ) as client:
+        robots = await load_robots(client, site_url)
+        homepage_url = normalize_url(site_url, site_url)
+        if not robots.can_fetch(USER_AGENT, homepage_url):
+            logger.warning(f"robots.txt disallows crawling {site_url}")
+            return pages
+        seeds = await sitemap_urls(client, site_url, robots, limit=max_pages * 4)
 
-    logger.info(f"Crawled {site_url}: {len(pages)} pages with content")
+        frontier = CrawlFrontier(settings.CRAWL_MAX_DEPTH, robots)
+        frontier.mark_seen(homepage_url)
+        fetcher = PageFetcher(client, profile, urlparse(site_url).hostname or "", deadline, progress, previous)
+        try:
+            if progress:
+                await progress.add(urls_discovered=1)
+            homepage = await fetcher.fetch(site_url, "/", check_content=False)
+            if homepage is None:
+                logger.error(f"Failed to load homepage {site_url}")
+                return pages
+            homepage_data, homepage_links = homepage
+
+            homepage_fingerprint = ""
+            if homepage_data.get("not_modified") or homepage_data["sections"]:
+                pages.append({**homepage_data, "links": homepage_links})
+                # Create a fingerprint to detect duplicate pages (soft 404s that render homepage)
+                homepage_fingerprint = _page_fingerprint(homepage_data)
+
+            _follow_links(frontier, site_url, homepage_url, homepage_links, 0)
+            for url in seeds:
+                frontier.add(url, 1)
+
+            fetched = 1
+            while frontier and fetched < max_pages and time.monotonic() < deadline:
+                batch = frontier.next_level(max_pages - fetched)
+                fetched += len(batch)
+                if progress:
+                    await progress.add(urls_discovered=len(batch))
+
+                results = await _crawl_pages(fetcher, site_url, [url for url, _ in batch], deadline)
+
+                for (url, depth), result in zip(batch, results):
+                    if result is None:
+                        continue
+                    page_data, links = result
+                    if not _follow_links(frontier, site_url, url, links, depth):
+                        logger.info(f"Skipping {url} (duplicate of its canonical page)")
+                        continue
+                    if page_data is None:
+                        continue
+                    # Skip if page content is same as homepage (soft 404 / SPA fallback)
+                    if homepage_fingerprint and _page_fingerprint(page_data) == homepage_fingerprint:
+                        logger.info(f"Skipping {url} (duplicate of homepage)")
+                        continue
+                    pages.append({**page_data, "links": links})
+        finally:
+            await fetcher.close()
+
+    if frontier.disallowed:
+        logger.info(f"Skipped {frontier.disallowed} URLs on {site_url} disallowed by robots.txt")
+    logger.info(
+        f"Crawled {site_url}: {len(pages)} pages with content "
+        f"({fetcher.static_fetches} static, {fetcher.browser_fetches} browser fetches, "
+        f"{fetcher.not_modified} not modified, "
+        f"{fetcher.blocked_requests} requests blocked by the {profile.name} profile)"
+    )
     return pages
 
 
+def _follow_links(frontier: CrawlFrontier, site_url: str, url: str, links: dict, depth: int) -> bool:
+    """Queue a fetched page's links one level deeper; False if its canonical URL was already crawled."""
+    canonical = normalize_url(links["canonical"], site_url) if links.get("canonical") else None
+    if canonical and canonical != url:
+        if frontier.seen(canonical):
+            return False
+        frontier.mark_seen(canonical)
+    for link in links["links"]:
+        frontier.add(normalize_url(link, site_url), depth + 1)
+    return True
+
+
+async def _crawl_pages(fetcher: PageFetcher, site_url: str, urls: list[str], deadline: float) -> list[tuple | None]:
+    """Fetch and extract `urls` concurrently; results line up with `urls`, None where failed or out of time."""
+    if not urls:
+        return []
+    tasks = [asyncio.create_task(fetcher.fetch(url, site_path(url))) for url in urls]
+    done, pending = await asyncio.wait(tasks, timeout=max(deadline - time.monotonic(), 0))
+    if pending:
+        logger.warning(f"Crawl time budget for {site_url} exhausted; {len(pending)} pages not crawled")
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    return [task.result() if task in done else None for task in tasks]
+
+
 async def _extract_page_data(page, path: str) -> dict:
     """Extract title, meta description, and sections from the current page."""
     title = await page.title()
@@ -205,6 +569,12 @@ async def _extract_page_data(page, path: str) -> dict:
     }
 
 
+def _page_fingerprint(page_data: dict) -> str:
+    if page_data.get("not_modified"):
+        return page_data["fingerprint"]
+    return _content_fingerprint(page_data["sections"])
+
+
 def _content_fingerprint(sections: list[dict]) -> str:
     """Create a simple fingerprint from section headings to detect duplicate pages."""
     return "|".join(sorted(s.get("heading", "")[:50] for s in sections))
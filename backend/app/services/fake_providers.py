@@ -0,0 +1,107 @@
+"""Deterministic local stand-ins for the LLM, STT and TTS providers.
+
+Selected with PROVIDER_MODE=fake for offline development, tests and load tests. Each fake draws
+its latency from a configurable distribution with its own seeded RNG, so a given sequence of
+calls always sees the same delays and failures.
+"""
+import asyncio
+import io
+import math
+import random
+import wave
+
+from ..config import settings
+
+FAKE_SAMPLE_RATE = 16000
+
+
+class FakeProviderError(Exception):
+    pass
+
+
+class LatencyDistribution:
+    """Parsed from a spec string: "constant:<s>", "uniform:<low>:<high>" or "lognormal:<median>:<sigma>"."""
+
+    def __init__(self, spec: str, failure_rate: float, seed: int):
+        kind, *params = spec.split(":")
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        if (kind, len(self.params)) not in (("constant", 1), ("uniform", 2), ("lognormal", 2)):
+            raise ValueError(f"Invalid latency spec: {spec!r}")
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+
+    def sample(self) -> tuple[float, bool]:
+        """Return (delay in seconds, whether this call fails)."""
+        if self.kind == "constant":
+            delay = self.params[0]
+        elif self.kind == "uniform":
+            delay = self._rng.uniform(*self.params)
+        else:
+            median, sigma = self.params
+            delay = self._rng.lognormvariate(math.log(median), sigma)
+        return delay, self._rng.random() < self.failure_rate
+
+    async def wait(self, name: str) -> None:
+        delay, fails = self.sample()
+        await asyncio.sleep(delay)
+        if fails:
+            raise FakeProviderError(f"{name}: injected failure")
+
+
+class FakeLLM:
+    def __init__(self, latency: LatencyDistribution):
+        self.latency = latency
+
+    async def chat(self, message: str, conversation_history: list, system_prompt: str, language: str) -> dict:
+        await self.latency.wait("fake-llm")
+        return {"text": _reply(message, language), "actions": [], "language": language}
+
+    async def stream_chat(self, message: str, conversation_history: list, system_prompt: str, language: str):
+        await self.latency.wait("fake-llm")
+        for word in _reply(message, language).split(" "):
+            await asyncio.sleep(0.01)
+            yield "text", word + " "
+
+    async def generate(self, prompt: str) -> str:
+        await self.latency.wait("fake-llm")
+        return f"Summary of {len(prompt)} characters of text."
+
+
+class FakeSTT:
+    def __init__(self, latency: LatencyDistribution):
+        self.latency = latency
+
+    async def transcribe(self, audio_bytes: bytes, language_hints: list[str] | None) -> str:
+        await self.latency.wait("fake-stt")
+        return f"Fake transcript of {len(audio_bytes)} bytes"
+
+
+class FakeTTS:
+    def __init__(self, latency: LatencyDistribution):
+        self.latency = latency
+
+    async def synthesize(self, text: str, language: str) -> bytes:
+        await self.latency.wait("fake-tts")
+        # Silence lasting roughly as long as the text would take to say
+        seconds = max(len(text) / 15, 0.5)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(FAKE_SAMPLE_RATE)
+            wav.writeframes(b"\x00\x00" * int(FAKE_SAMPLE_RATE * seconds))
+        return buffer.getvalue()
+
+
+def _reply(message: str, language: str) -> str:
+    return f"[fake {language}] You said: {message[:200]}"
+
+
+def _latency(spec: str, offset: int) -> LatencyDistribution:
+    return LatencyDistribution(spec, settings.FAKE_PROVIDER_FAILURE_RATE, settings.FAKE_PROVIDER_SEED + offset)
+
+
+fake_llm = FakeLLM(_latency(settings.FAKE_LLM_LATENCY, 0))
+fake_stt = FakeSTT(_latency(settings.FAKE_STT_LATENCY, 1))
+fake_tts = FakeTTS(_latency(settings.FAKE_TTS_LATENCY, 2))
@@ -1,9 +1,10 @@
-import google.generativeai as genai
+from functools import partial
 
 from ..config import settings
 from ..core.prompts import build_system_prompt
-
-genai.configure(api_key=settings.GEMINI_API_KEY)
+from .fake_providers import fake_llm
+from .model_registry import get_model
+from .providers import register_chain
 
 WIDGET_TOOLS = [
     {
@@ -45,26 +46,18 @@ WIDGET_TOOLS = [
 ]
 
 
-async def chat_with_visitor(
-    message: str,
-    conversation_history: list,
-    site_map: dict,
-    widget_config: dict,
-    language: str,
-) -> dict:
-    system_prompt = build_system_prompt(site_map, widget_config, language)
-
-    model = genai.GenerativeModel(
-        model_name="gemini-2.0-flash",
-        system_instruction=system_prompt,
-        tools=WIDGET_TOOLS,
-    )
+def _start_chat(model_name: str, conversation_history: list, system_prompt: str):
+    model = get_model(model_name, system_instruction=system_prompt, tools=WIDGET_TOOLS)
 
     history = []
     for msg in conversation_history:
         history.append({"role": msg["role"], "parts": [msg["content"]]})
 
-    chat = model.start_chat(history=history)
+    return model.start_chat(history=history)
+
+
+async def _gemini_chat(model_name: str, message: str, conversation_history: list, system_prompt: str, language: str) -> dict:
+    chat = _start_chat(model_name, conversation_history, system_prompt)
     response = await chat.send_message_async(message)
 
     text_response = ""
@@ -84,12 +77,92 @@ async def chat_with_visitor(
     }
 
 
+async def _gemini_stream_chat(model_name: str, message: str, conversation_history: list, system_prompt: str, language: str):
+    chat = _start_chat(model_name, conversation_history, system_prompt)
+    response = await chat.send_message_async(message, stream=True)
+
+    async for chunk in response:
+        for part in chunk.parts:
+            if part.text:
+                yield "text", part.text
+            if part.function_call:
+                fn = part.function_call
+                yield "action", {"type": fn.name, "params": dict(fn.args)}
+
+
+async def _gemini_generate(model_name: str, prompt: str) -> str:
+    response = await get_model(model_name).generate_content_async(prompt)
+    return response.text.strip()
+
+
+_chat_chain = register_chain(
+    "llm_chat",
+    [(f"gemini:{m}", partial(_gemini_chat, m)) for m in settings.LLM_MODELS],
+    [("fake", fake_llm.chat)],
+    deadline=settings.LLM_DEADLINE,
+    hedge=True,
+)
+_stream_chain = register_chain(
+    "llm_stream",
+    [(f"gemini:{m}", partial(_gemini_stream_chat, m)) for m in settings.LLM_MODELS],
+    [("fake", fake_llm.stream_chat)],
+    deadline=settings.LLM_DEADLINE,
+    hedge=False,
+)
+# Summaries run off the request path (crawls, history compaction), so they fall back but never hedge
+_generate_chain = register_chain(
+    "llm_generate",
+    [(f"gemini:{m}", partial(_gemini_generate, m)) for m in settings.LLM_MODELS],
+    [("fake", fake_llm.generate)],
+    deadline=settings.SUMMARY_DEADLINE,
+    hedge=False,
+)
+
+
+async def chat_with_visitor(
+    message: str,
+    conversation_history: list,
+    site_map: dict,
+    widget_config: dict,
+    language: str,
+    system_prompt: str | None = None,
+) -> dict:
+    if system_prompt is None:
+        system_prompt = build_system_prompt(site_map, widget_config, language)
+    return await _chat_chain.call(message, conversation_history, system_prompt, language)
+
+
+async def stream_chat_with_visitor(
+    message: str,
+    conversation_history: list,
+    site_map: dict,
+    widget_config: dict,
+    language: str,
+    system_prompt: str | None = None,
+):
+    """Yield ("text", delta) and ("action", action) events as the model produces them."""
+    if system_prompt is None:
+        system_prompt = build_system_prompt(site_map, widget_config, language)
+    async for event in _stream_chain.stream(message, conversation_history, system_prompt, language):
+        yield event
+
+
 async def gemini_summarize(content: str) -> str:
-    model = genai.GenerativeModel("gemini-2.0-flash")
     prompt = (
         "Summarize the following website section content in 2-3 concise sentences. "
         "Focus on what the section is about and what information it provides to visitors:\n\n"
         f"{content[:3000]}"
     )
-    response = await model.generate_content_async(prompt)
-    return response.text.strip()
+    return await _generate_chain.call(prompt)
+
+
+async def summarize_conversation(previous_summary: str, messages: list) -> str:
+    transcript = "\n".join(f"{m['role'].upper()}: {m['content']}" for m in messages)
+    prompt = (
+        "Update the running summary of a conversation between a website visitor and the site's voice assistant. "
+        "Keep it under 120 words, in the conversation's language, and keep what the visitor asked about, "
+        "their stated needs, and any pages or sections already discussed.\n\n"
+        f"CURRENT SUMMARY:\n{previous_summary or '(none)'}\n\n"
+        f"NEW MESSAGES:\n{transcript[:6000]}"
+    )
+    return await _generate_chain.call(prompt)
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import re
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..core.cache import register_cache
+from ..core.database import async_session_factory
+from ..core.text import fold_text
+from ..models.question_sketch import QuestionSketch
+from ..models.site import Site
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^\w']+")
+
+
+def normalize_question(text: str) -> str:
+    """Fold case, script and punctuation so trivially different phrasings count as one question."""
+    return " ".join(_NON_WORD.sub(" ", fold_text(text)).replace("'", "").split())
+
+
+class SpaceSaving:
+    """Space-Saving heavy-hitters summary: at most `capacity` counters, each with an overestimation bound.
+
+    Counts are upper bounds; count - error is a guaranteed lower bound. Each counter also keeps one
+    original phrasing to display.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counters: dict[str, list] = {}  # key -> [count, error, example]
+
+    def add(self, key: str, example: str, weight: int = 1) -> None:
+        counter = self.counters.get(key)
+        if counter is not None:
+            counter[0] += weight
+            return
+        if len(self.counters) < self.capacity:
+            self.counters[key] = [weight, 0, example]
+            return
+        victim = min(self.counters, key=lambda k: self.counters[k][0])
+        floor = self.counters.pop(victim)[0]
+        self.counters[key] = [floor + weight, floor, example]
+
+    def merge(self, other: "SpaceSaving") -> None:
+        # A key missing from a full summary may still have occurred up to that summary's minimum count
+        self_floor = self._floor()
+        other_floor = other._floor()
+        merged = {}
+        for key in self.counters.keys() | other.counters.keys():
+            mine = self.counters.get(key, [self_floor, self_floor, None])
+            theirs = other.counters.get(key, [other_floor, other_floor, None])
+            merged[key] = [mine[0] + theirs[0], mine[1] + theirs[1], mine[2] or theirs[2]]
+        kept = sorted(merged, key=lambda k: merged[k][0], reverse=True)[:self.capacity]
+        self.counters = {k: merged[k] for k in kept}
+
+    def _floor(self) -> int:
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(c[0] for c in self.counters.values())
+
+    def top(self, n: int) -> list[dict]:
+        ranked = sorted(self.counters.values(), key=lambda c: (-c[0], c[2]))[:n]
+        return [{"question": example, "count": count} for count, _, example in ranked]
+
+    def to_dict(self) -> dict:
+        return {"capacity": self.capacity, "counters": self.counters}
+
+    @classmethod
+    def from_dict(cls, data: dict | None, capacity: int) -> "SpaceSaving":
+        sketch = cls(capacity)
+        if data:
+            sketch.counters = {k: list(v) for k, v in data.get("counters", {}).items()}
+        return sketch
+
+
+class QuestionTracker:
+    """Per-site question sketches for this process, periodically merged into question_sketches.
+
+    Reads merge the stored sketch with the unflushed local one, so top-N costs O(capacity) no
+    matter how much conversation history a site has.
+    """
+
+    def __init__(self, session_factory, capacity: int, persist_interval: float):
+        self.session_factory = session_factory
+        self.capacity = capacity
+        self.persist_interval = persist_interval
+        self._pending: dict[UUID, SpaceSaving] = {}
+        self._failures: dict[UUID, int] = {}
+        self._task: asyncio.Task | None = None
+        self.recorded = 0
+        self.persisted = 0
+        self.dropped = 0
+
+    def record(self, site_id: UUID, question: str) -> None:
+        key = normalize_question(question)
+        if not key:
+            return
+        sketch = self._pending.get(site_id)
+        if sketch is None:
+            sketch = self._pending[site_id] = SpaceSaving(self.capacity)
+        sketch.add(key, question.strip()[:300])
+        self.recorded += 1
+
+    async def top_questions(self, db: AsyncSession, site_id: UUID, n: int = 10) -> list[dict]:
+        result = await db.execute(select(QuestionSketch.sketch).where(QuestionSketch.site_id == site_id))
+        sketch = SpaceSaving.from_dict(result.scalar_one_or_none(), self.capacity)
+        if site_id in self._pending:
+            sketch.merge(self._pending[site_id])
+        return sketch.top(n)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.persist()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.persist_interval)
+            await self.persist()
+
+    async def persist(self) -> None:
+        pending, self._pending = self._pending, {}
+        for site_id, delta in pending.items():
+            try:
+                await self._persist_site(site_id, delta)
+            except Exception as e:
+                failures = self._failures[site_id] = self._failures.get(site_id, 0) + 1
+                if failures >= settings.QUESTION_SKETCH_MAX_RETRIES:
+                    logger.error(f"Dropping question sketch for site {site_id} after {failures} failed attempts: {e}")
+                    self._failures.pop(site_id)
+                    self.dropped += 1
+                    continue
+                logger.error(f"Failed to persist question sketch for site {site_id}: {e}")
+                # Keep the delta for the next attempt, folding in anything recorded meanwhile
+                if site_id in self._pending:
+                    delta.merge(self._pending[site_id])
+                self._pending[site_id] = delta
+            else:
+                self._failures.pop(site_id, None)
+
+    async def _persist_site(self, site_id: UUID, delta: SpaceSaving) -> None:
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(QuestionSketch).where(QuestionSketch.site_id == site_id).with_for_update()
+            )
+            row = result.scalar_one_or_none()
+            if row is None:
+                if await db.scalar(select(Site.id).where(Site.id == site_id)) is None:
+                    # The site was deleted since these questions were asked
+                    self.dropped += 1
+                    return
+                row = QuestionSketch(site_id=site_id)
+                db.add(row)
+            sketch = SpaceSaving.from_dict(row.sketch, self.capacity)
+            sketch.merge(delta)
+            row.sketch = sketch.to_dict()
+            row.updated_at = datetime.now(timezone.utc)
+            await db.commit()
+        self.persisted += 1
+
+    def stats(self) -> dict:
+        return {
+            "sites_pending": len(self._pending),
+            "recorded": self.recorded,
+            "persisted": self.persisted,
+            "dropped": self.dropped,
+            "capacity": self.capacity,
+        }
+
+
+question_tracker = QuestionTracker(
+    async_session_factory,
+    capacity=settings.QUESTION_SKETCH_CAPACITY,
+    persist_interval=settings.QUESTION_SKETCH_PERSIST_INTERVAL,
+)
+register_cache("question_sketches", question_tracker)
@@ -0,0 +1,144 @@
+import asyncio
+import hashlib
+import logging
+
+from ..config import settings
+from ..core.cache import LRUCache, register_cache
+from ..core.text import estimate_tokens
+from .gemini_service import summarize_conversation
+
+logger = logging.getLogger(__name__)
+
+# digest of a history prefix -> rolling summary of that prefix
+_summary_cache = LRUCache(max_entries=settings.HISTORY_SUMMARY_CACHE_SIZE)
+register_cache("history_summaries", _summary_cache)
+
+
+class HistoryStats:
+    def __init__(self):
+        self.requests = 0
+        self.compacted = 0
+        self.summary_failures = 0
+        self.summaries_refreshed = 0
+        self.messages_trimmed = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.max_tokens_trimmed = 0
+
+    def record(self, tokens_in: int, tokens_out: int, messages_trimmed: int) -> None:
+        self.requests += 1
+        self.tokens_in += tokens_in
+        self.tokens_out += tokens_out
+        if messages_trimmed:
+            self.compacted += 1
+            self.messages_trimmed += messages_trimmed
+            self.max_tokens_trimmed = max(self.max_tokens_trimmed, tokens_in - tokens_out)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "compacted_requests": self.compacted,
+            "summary_failures": self.summary_failures,
+            "summaries_refreshed": self.summaries_refreshed,
+            "messages_trimmed": self.messages_trimmed,
+            "tokens_in": self.tokens_in,
+            "tokens_out": self.tokens_out,
+            "tokens_trimmed": self.tokens_in - self.tokens_out,
+            "avg_tokens_trimmed_per_request": round((self.tokens_in - self.tokens_out) / self.requests, 1)
+            if self.requests else 0.0,
+            "max_tokens_trimmed": self.max_tokens_trimmed,
+        }
+
+
+history_stats = HistoryStats()
+register_cache("history", history_stats)
+
+
+def _message_tokens(message: dict) -> int:
+    return estimate_tokens(message["content"]) + 4
+
+
+def compact_history(history: list[dict], token_budget: int) -> list[dict]:
+    """Fit conversation history into a token budget without waiting on the LLM.
+
+    The last HISTORY_KEEP_TURNS exchanges are kept verbatim (oldest dropped first if even they
+    overflow); everything before them is replaced by the latest cached rolling summary. Messages
+    that left the verbatim window after that summary was made stay verbatim until
+    HISTORY_SUMMARY_REFRESH_MESSAGES of them have piled up, and then the summary is extended in
+    the background for later turns.
+    """
+    tokens_in = sum(_message_tokens(m) for m in history)
+    if tokens_in <= token_budget:
+        history_stats.record(tokens_in, tokens_in, 0)
+        return history
+
+    keep = settings.HISTORY_KEEP_TURNS * 2
+    older, recent = history[:-keep], history[-keep:]
+
+    summary_messages = []
+    if older:
+        summary, covered = _rolling_summary(older)
+        if summary:
+            summary_messages = [
+                {"role": "user", "content": f"(Summary of our earlier conversation: {summary})"},
+                {"role": "assistant", "content": "Understood."},
+            ]
+        recent = older[covered:] + recent
+
+    budget = token_budget - sum(_message_tokens(m) for m in summary_messages)
+    while recent and sum(_message_tokens(m) for m in recent) > budget:
+        recent = recent[1:]
+    # Keep turns alternating: the verbatim window opens with a visitor message
+    while recent and recent[0]["role"] != "user":
+        recent = recent[1:]
+
+    compacted = summary_messages + recent
+    tokens_out = sum(_message_tokens(m) for m in compacted)
+    history_stats.record(tokens_in, tokens_out, len(history) - len(recent))
+    logger.debug(f"Compacted history from {tokens_in} to {tokens_out} tokens ({len(history)} -> {len(compacted)} messages)")
+    return compacted
+
+
+_refreshing: set[str] = set()  # digests being summarized, each by one background task
+_tasks: set[asyncio.Task] = set()
+
+
+def _rolling_summary(messages: list[dict]) -> tuple[str, int]:
+    """The cached summary of the longest summarized prefix of `messages` and how many messages it covers."""
+    # digests[i] identifies messages[:i + 1]
+    digests = []
+    running = hashlib.sha256()
+    for message in messages:
+        running.update(f"{message['role']}\0{message['content']}\0".encode("utf-8"))
+        digests.append(running.hexdigest())
+
+    summary, covered = "", 0
+    for i in range(len(digests) - 1, -1, -1):
+        if (cached := _summary_cache.get(digests[i])) is not None:
+            summary, covered = cached, i + 1
+            break
+
+    uncovered = len(messages) - covered
+    if uncovered >= settings.HISTORY_SUMMARY_REFRESH_MESSAGES or (not summary and uncovered):
+        if digests[-1] not in _refreshing:
+            _refreshing.add(digests[-1])
+            task = asyncio.create_task(_refresh_summary(digests[-1], summary, messages[covered:]))
+            _tasks.add(task)
+            task.add_done_callback(_tasks.discard)
+    return summary, covered
+
+
+async def _refresh_summary(digest: str, previous_summary: str, messages: list[dict]) -> None:
+    try:
+        summary = await asyncio.wait_for(
+            summarize_conversation(previous_summary, messages),
+            timeout=settings.HISTORY_SUMMARY_TIMEOUT,
+        )
+    except Exception as e:
+        history_stats.summary_failures += 1
+        logger.warning(f"History summarization failed, keeping the previous summary: {e}")
+        return
+    finally:
+        _refreshing.discard(digest)
+    history_stats.summaries_refreshed += 1
+    _summary_cache.set(digest, summary)
@@ -0,0 +1,261 @@
+"""Static-HTML counterpart of the crawler's in-browser extraction.
+
+Parses server-rendered HTML with the stdlib parser into a small element tree and reproduces
+the section, link and content checks the crawler otherwise runs as JavaScript in Playwright.
+innerText is approximated: script/style/hidden elements are skipped and block elements break
+lines, but only inline `display: none` is honoured — stylesheets are not evaluated.
+"""
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr",
+}
+# Tags the parser closes implicitly when a sibling of the same kind opens
+SELF_CLOSING_SIBLINGS = {"p", "li", "dt", "dd", "option", "tr", "td", "th"}
+SKIP_TEXT_TAGS = {"script", "style", "noscript", "template", "head", "title", "svg", "iframe", "object"}
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "dd", "details", "div", "dl", "dt", "fieldset", "figcaption",
+    "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol",
+    "p", "pre", "section", "summary", "table", "tr", "ul",
+}
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+SECTION_ID_EXCLUDED = {"script", "style", "link", "head", "html"}
+NAV_SCOPES = {"nav", "header", "footer"}
+SPA_ROOT_IDS = {"root", "app", "__next", "__nuxt", "___gatsby", "svelte"}
+
+
+class Element:
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag: str, attrs: dict, parent: "Element | None"):
+        self.tag = tag
+        self.attrs = attrs
+        self.children: list["Element | str"] = []
+        self.parent = parent
+
+    def iter(self):
+        """Descendant elements in document order (excluding self)."""
+        stack = [c for c in reversed(self.children) if isinstance(c, Element)]
+        while stack:
+            el = stack.pop()
+            yield el
+            stack.extend(c for c in reversed(el.children) if isinstance(c, Element))
+
+    def find(self, predicate) -> "Element | None":
+        return next((el for el in self.iter() if predicate(el)), None)
+
+    def next_siblings(self):
+        if self.parent is None:
+            return
+        siblings = [c for c in self.parent.children if isinstance(c, Element)]
+        yield from siblings[siblings.index(self) + 1:]
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Element("#document", {}, None)
+        self.current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SELF_CLOSING_SIBLINGS and self.current.tag == tag:
+            self.current = self.current.parent
+        el = Element(tag, {k: v or "" for k, v in attrs}, self.current)
+        self.current.children.append(el)
+        if tag not in VOID_TAGS:
+            self.current = el
+
+    def handle_startendtag(self, tag, attrs):
+        self.current.children.append(Element(tag, {k: v or "" for k, v in attrs}, self.current))
+
+    def handle_endtag(self, tag):
+        node = self.current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        # Stray end tags (no matching open element) are ignored, like browsers do
+        if node is not self.root:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        self.current.children.append(data)
+
+
+class HtmlDocument:
+    """A parsed page with the queries the crawler needs, caching element text."""
+
+    def __init__(self, html: str, url: str):
+        builder = _TreeBuilder()
+        builder.feed(html)
+        builder.close()
+        self.root = builder.root
+        self.url = url
+        self._text: dict[int, str] = {}
+        self.body = self.root.find(lambda el: el.tag == "body") or self.root
+        base = self.root.find(lambda el: el.tag == "base" and el.attrs.get("href"))
+        self.base_url = urljoin(url, base.attrs["href"]) if base else url
+
+    def text(self, el: Element) -> str:
+        """Approximate innerText: visible text with block elements on their own lines."""
+        key = id(el)
+        if key not in self._text:
+            parts: list[str] = []
+            self._collect(el, parts)
+            lines = (re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in "".join(parts).split("\n"))
+            self._text[key] = "\n".join(line for line in lines if line)
+        return self._text[key]
+
+    def _collect(self, el: Element, parts: list[str]) -> None:
+        for child in el.children:
+            if isinstance(child, str):
+                parts.append(re.sub(r"\s+", " ", child))
+            elif child.tag == "br":
+                parts.append("\n")
+            elif _is_hidden(child):
+                continue
+            elif child.tag in BLOCK_TAGS:
+                parts.append("\n")
+                self._collect(child, parts)
+                parts.append("\n")
+            else:
+                self._collect(child, parts)
+
+    @property
+    def title(self) -> str:
+        title = self.root.find(lambda el: el.tag == "title")
+        if title is None:
+            return ""
+        return re.sub(r"\s+", " ", "".join(c for c in title.children if isinstance(c, str))).strip()
+
+    @property
+    def main(self) -> Element:
+        return self.root.find(lambda el: el.tag == "main") or self.body
+
+
+def _is_hidden(el: Element) -> bool:
+    return (
+        el.tag in SKIP_TEXT_TAGS
+        or "hidden" in el.attrs
+        or bool(re.search(r"display\s*:\s*none", el.attrs.get("style", ""), re.I))
+    )
+
+
+def _is_section_candidate(el: Element) -> bool:
+    # section, [id]:not(script):not(style):not(link):not(head):not(html), main > div, article
+    if _is_hidden(el):
+        return False
+    if el.tag in ("section", "article"):
+        return True
+    if "id" in el.attrs and el.tag not in SECTION_ID_EXCLUDED:
+        return True
+    return el.tag == "div" and el.parent is not None and el.parent.tag == "main"
+
+
+def extract_page_data(doc: HtmlDocument, path: str) -> dict:
+    """Title, meta description and sections of a static page, matching the browser extraction."""
+    meta = doc.root.find(lambda el: el.tag == "meta" and el.attrs.get("name") == "description")
+    sections = []
+    seen = set()
+
+    for el in doc.root.iter():
+        if not _is_section_candidate(el):
+            continue
+        heading = el.find(lambda h: h.tag in HEADING_TAGS)
+        section_id = el.attrs.get("id") or el.attrs.get("data-section") or None
+        text = doc.text(el)[:2000].strip()
+        if len(text) < 20:
+            continue
+        key = (doc.text(heading) if heading else "") + text[:100]
+        if key in seen:
+            continue
+        seen.add(key)
+        sections.append({
+            "id": f"#{section_id}" if section_id else None,
+            "heading": doc.text(heading).strip() if heading else "",
+            "content": text,
+        })
+
+    # Fallback: extract by headings
+    if not sections:
+        main = (
+            doc.root.find(lambda el: el.tag == "main")
+            or doc.root.find(lambda el: el.attrs.get("role") == "main")
+            or doc.body
+        )
+        for h in (el for el in main.iter() if el.tag in ("h1", "h2", "h3")):
+            content = ""
+            for sibling in h.next_siblings():
+                if sibling.tag in ("h1", "h2", "h3"):
+                    break
+                content += doc.text(sibling) + " "
+            text = content.strip()
+            if len(text) > 20:
+                sections.append({
+                    "id": f"#{h.attrs['id']}" if h.attrs.get("id") else None,
+                    "heading": doc.text(h).strip(),
+                    "content": text[:2000],
+                })
+
+    # Last resort: if still nothing, grab the whole page text
+    if not sections:
+        text = doc.text(doc.main).strip()
+        if len(text) > 50:
+            sections.append({"id": None, "heading": doc.title or "Main Content", "content": text[:5000]})
+
+    return {
+        "url": path,
+        "title": doc.title or path,
+        "meta_description": meta.attrs.get("content") if meta is not None else None,
+        "sections": sections,
+    }
+
+
+def has_content(doc: HtmlDocument) -> bool:
+    """Whether the page has real content rather than being empty or a soft 404."""
+    text = doc.text(doc.main).strip()
+    if len(text) < 100:
+        return False
+    lower = text.lower()
+    if "404" in lower and "not found" in lower:
+        return False
+    return "page not found" not in lower and "this page could not be found" not in lower
+
+
+def page_links(doc: HtmlDocument) -> dict:
+    """Absolute link targets (navigation links first) and the canonical URL, like PAGE_LINKS_JS."""
+    anchors = [
+        el for el in doc.root.iter()
+        if el.tag == "a" and "href" in el.attrs and _in_navigation(el)
+    ] + [el for el in doc.root.iter() if el.tag == "a" and "href" in el.attrs]
+    links = {}
+    for a in anchors:
+        href = a.attrs["href"].strip()
+        if not href or href.startswith("#") or re.match(r"(javascript|mailto|tel):", href, re.I):
+            continue
+        links[urljoin(doc.base_url, href)] = None
+    canonical = doc.root.find(lambda el: el.tag == "link" and el.attrs.get("rel") == "canonical")
+    return {
+        "links": list(links),
+        "canonical": urljoin(doc.base_url, canonical.attrs.get("href", "")) if canonical is not None else None,
+    }
+
+
+def _in_navigation(el: Element) -> bool:
+    node = el.parent
+    while node is not None:
+        if node.tag in NAV_SCOPES or node.attrs.get("role") == "navigation":
+            return True
+        node = node.parent
+    return False
+
+
+def needs_browser(doc: HtmlDocument, min_text: int) -> str | None:
+    """Why the static HTML can't be trusted (an SPA shell or too little text), or None if it can."""
+    for el in doc.root.iter():
+        is_mount = el.attrs.get("id") in SPA_ROOT_IDS or "data-reactroot" in el.attrs or "ng-version" in el.attrs
+        if is_mount and len(doc.text(el)) < min_text:
+            return "SPA shell"
+    if len(doc.text(doc.body)) < min_text:
+        return "thin content"
+    return None
@@ -0,0 +1,45 @@
+import hashlib
+import json
+
+import google.generativeai as genai
+
+from ..config import settings
+from ..core.cache import LRUCache, register_cache
+
+genai.configure(api_key=settings.GEMINI_API_KEY)
+
+# (model name, system instruction, tool set digest) -> GenerativeModel. The instruction string itself is
+# part of the key: str caches its hash, so repeat lookups with a cached prompt cost no rehashing.
+_models = LRUCache(max_entries=settings.GEMINI_MODEL_CACHE_SIZE)
+register_cache("gemini_models", _models)
+
+# id(tools) -> (tools, digest); holding the list keeps its id from being reused
+_tool_digests: dict[int, tuple[list, str]] = {}
+
+
+def get_model(
+    model_name: str,
+    system_instruction: str | None = None,
+    tools: list | None = None,
+) -> genai.GenerativeModel:
+    """Return a shared GenerativeModel for this configuration, building it on first use."""
+    key = (model_name, system_instruction, _tools_digest(tools))
+    model = _models.get(key)
+    if model is None:
+        model = genai.GenerativeModel(
+            model_name=model_name,
+            system_instruction=system_instruction,
+            tools=tools,
+        )
+        _models.set(key, model)
+    return model
+
+
+def _tools_digest(tools: list | None) -> str:
+    if tools is None:
+        return ""
+    cached = _tool_digests.get(id(tools))
+    if cached is None:
+        digest = hashlib.sha256(json.dumps(tools, sort_keys=True).encode("utf-8")).hexdigest()
+        cached = _tool_digests[id(tools)] = (tools, digest)
+    return cached[1]
@@ -0,0 +1,123 @@
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+import httpx
+from google.cloud import texttospeech_v1
+from google.cloud.texttospeech_v1.services.text_to_speech.transports import TextToSpeechGrpcAsyncIOTransport
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderClients:
+    """Long-lived upstream clients shared by all requests in a process.
+
+    The API process creates them in the app lifespan; other processes (e.g. the crawler worker)
+    get them lazily on first use. Either way, close() releases the pooled connections.
+    """
+
+    def __init__(self):
+        self._transport: httpx.AsyncHTTPTransport | None = None
+        self._http: httpx.AsyncClient | None = None
+        self._tts: texttospeech_v1.TextToSpeechAsyncClient | None = None
+        self._in_flight: dict[str, int] = defaultdict(int)
+        self._peak_in_flight: dict[str, int] = defaultdict(int)
+        self._requests: dict[str, int] = defaultdict(int)
+
+    async def start(self) -> None:
+        self.http()
+        try:
+            self.tts()
+        except Exception as e:
+            # TTS is optional — requests retry lazily and fail the same way synthesize_speech always has
+            logger.warning(f"Google TTS client unavailable: {e}")
+
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._transport = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=settings.PROVIDER_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.PROVIDER_HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.PROVIDER_HTTP_KEEPALIVE_EXPIRY,
+                ),
+            )
+            self._http = httpx.AsyncClient(
+                transport=self._transport,
+                timeout=settings.PROVIDER_HTTP_TIMEOUT,
+            )
+        return self._http
+
+    def tts(self) -> texttospeech_v1.TextToSpeechAsyncClient:
+        if self._tts is None:
+            self._tts = texttospeech_v1.TextToSpeechAsyncClient(
+                transport=TextToSpeechGrpcAsyncIOTransport(channel=_tts_channel),
+            )
+        return self._tts
+
+    @asynccontextmanager
+    async def track(self, name: str):
+        """Count a call against an upstream so pool usage shows up in stats()."""
+        self._requests[name] += 1
+        self._in_flight[name] += 1
+        self._peak_in_flight[name] = max(self._peak_in_flight[name], self._in_flight[name])
+        try:
+            yield
+        finally:
+            self._in_flight[name] -= 1
+
+    async def close(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+            self._transport = None
+        if self._tts is not None:
+            try:
+                await self._tts.transport.close()
+            except Exception as e:
+                logger.warning(f"Failed to close TTS client: {e}")
+            self._tts = None
+
+    def stats(self) -> dict:
+        http_pool = None
+        pool = getattr(self._transport, "_pool", None)
+        if pool is not None:
+            connections = pool.connections
+            http_pool = {
+                "connections": len(connections),
+                "idle": sum(1 for c in connections if c.is_idle()),
+                "max_connections": settings.PROVIDER_HTTP_MAX_CONNECTIONS,
+                "max_keepalive_connections": settings.PROVIDER_HTTP_MAX_KEEPALIVE,
+            }
+        return {
+            "http_pool": http_pool,
+            "tts_client_open": self._tts is not None,
+            "upstreams": {
+                name: {
+                    "requests": self._requests[name],
+                    "in_flight": self._in_flight[name],
+                    "peak_in_flight": self._peak_in_flight[name],
+                }
+                for name in self._requests
+            },
+        }
+
+
+def _tts_channel(*args, options=(), **kwargs):
+    """The transport's default channel plus keepalive pings, so an idle channel isn't silently
+    dropped by a NAT or load balancer and the next synthesis doesn't stall on a dead connection."""
+    return TextToSpeechGrpcAsyncIOTransport.create_channel(
+        *args,
+        options=[
+            *options,
+            ("grpc.keepalive_time_ms", int(settings.TTS_GRPC_KEEPALIVE_TIME * 1000)),
+            ("grpc.keepalive_timeout_ms", int(settings.TTS_GRPC_KEEPALIVE_TIMEOUT * 1000)),
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.max_pings_without_data", 0),
+        ],
+        **kwargs,
+    )
+
+
+provider_clients = ProviderClients()
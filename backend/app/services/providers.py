@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderError(Exception):
+    """Every provider in a chain failed or the chain ran out of time."""
+
+
+class LatencyTracker:
+    """Recent successful-call latencies for one provider route, used to pick the hedge delay."""
+
+    def __init__(self, window: int):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._sorted: list[float] | None = None
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._sorted = None
+
+    def quantile(self, q: float) -> float | None:
+        if len(self._samples) < settings.PROVIDER_HEDGE_MIN_SAMPLES:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self._samples)
+        return self._sorted[min(len(self._sorted) - 1, int(len(self._sorted) * q))]
+
+    def hedge_delay(self) -> float:
+        observed = self.quantile(settings.PROVIDER_HEDGE_QUANTILE)
+        if observed is None:
+            return settings.PROVIDER_HEDGE_DEFAULT_DELAY
+        return max(observed, settings.PROVIDER_HEDGE_MIN_DELAY)
+
+
+class _RouteStats:
+    __slots__ = ("attempts", "successes", "errors", "timeouts", "hedges", "hedge_wins", "latency")
+
+    def __init__(self):
+        self.attempts = 0
+        self.successes = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.latency = LatencyTracker(settings.PROVIDER_LATENCY_WINDOW)
+
+    def as_dict(self) -> dict:
+        p50 = self.latency.quantile(0.5)
+        p95 = self.latency.quantile(0.95)
+        return {
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+
+class ProviderChain:
+    """Calls an ordered list of interchangeable provider routes under one deadline.
+
+    The primary route gets PROVIDER_PRIMARY_SHARE of the deadline and the fallbacks split the
+    rest, plus whatever an earlier route left unused. While a route is running, a second
+    identical attempt is fired once the route's p95 latency has passed (when `hedge` is on), and
+    whichever finishes first wins. If a route fails or runs out of its share, the next one is
+    tried. Hedging suits idempotent calls only — it can double upstream usage for slow requests.
+    """
+
+    def __init__(self, operation: str, routes: list[tuple[str, Callable[..., Any]]], deadline: float, hedge: bool):
+        self.operation = operation
+        self.routes = routes
+        self.deadline = deadline
+        self.hedge = hedge and settings.PROVIDER_HEDGE_ENABLED
+        self._stats = {name: _RouteStats() for name, _ in routes}
+        self.calls = 0
+        self.fallbacks = 0
+        self.failures = 0
+
+    async def call(self, *args, **kwargs) -> Any:
+        self.calls += 1
+        deadline = time.monotonic() + self.deadline
+        last_error: BaseException | None = None
+        for position, (name, fn) in enumerate(self.routes):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                result = await self._attempt(name, fn, args, kwargs, self._budget(position, remaining))
+            except Exception as e:
+                last_error = e
+                logger.warning(f"{self.operation} via {name} failed: {e!r}")
+                continue
+            if position:
+                self.fallbacks += 1
+            return result
+        self.failures += 1
+        raise ProviderError(f"{self.operation}: all providers failed") from last_error
+
+    async def stream(self, *args, **kwargs) -> AsyncIterator:
+        """Fall back between streaming routes until one produces its first item within its share of the deadline."""
+        self.calls += 1
+        deadline = time.monotonic() + self.deadline
+        last_error: BaseException | None = None
+        for position, (name, fn) in enumerate(self.routes):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            stats = self._stats[name]
+            stats.attempts += 1
+            started = time.monotonic()
+            events = fn(*args, **kwargs)
+            try:
+                first = await asyncio.wait_for(events.__anext__(), self._budget(position, remaining))
+            except StopAsyncIteration:
+                first = None
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    stats.timeouts += 1
+                else:
+                    stats.errors += 1
+                last_error = e
+                logger.warning(f"{self.operation} via {name} failed before first event: {e!r}")
+                await events.aclose()
+                continue
+            stats.successes += 1
+            stats.latency.add(time.monotonic() - started)
+            if position:
+                self.fallbacks += 1
+            if first is None:
+                return
+            yield first
+            async for event in events:
+                yield event
+            return
+        self.failures += 1
+        raise ProviderError(f"{self.operation}: all providers failed") from last_error
+
+    def _budget(self, position: int, remaining: float) -> float:
+        routes_left = len(self.routes) - position
+        if routes_left == 1:
+            return remaining
+        if position == 0:
+            return remaining * settings.PROVIDER_PRIMARY_SHARE
+        return remaining / routes_left
+
+    async def _attempt(self, name: str, fn: Callable[..., Awaitable], args, kwargs, budget: float) -> Any:
+        stats = self._stats[name]
+        deadline = time.monotonic() + budget
+        hedge_at = time.monotonic() + stats.latency.hedge_delay() if self.hedge else None
+
+        async def timed(hedged: bool):
+            started = time.monotonic()
+            result = await fn(*args, **kwargs)
+            return result, time.monotonic() - started, hedged
+
+        stats.attempts += 1
+        pending = {asyncio.create_task(timed(False))}
+        last_error: BaseException | None = None
+        try:
+            while pending:
+                now = time.monotonic()
+                wake_at = min(deadline, hedge_at) if hedge_at is not None else deadline
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(wake_at - now, 0), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        result, seconds, hedged = task.result()
+                        stats.successes += 1
+                        stats.hedge_wins += hedged
+                        stats.latency.add(seconds)
+                        return result
+                    last_error = task.exception()
+                if done:
+                    # A failed attempt is not hedged; the chain falls back instead
+                    hedge_at = None
+                    continue
+                if time.monotonic() >= deadline:
+                    stats.timeouts += 1
+                    raise asyncio.TimeoutError(f"{name} exceeded {budget:.1f}s")
+                if hedge_at is not None and time.monotonic() >= hedge_at:
+                    stats.hedges += 1
+                    hedge_at = None
+                    pending.add(asyncio.create_task(timed(True)))
+        finally:
+            for task in pending:
+                task.cancel()
+        stats.errors += 1
+        raise last_error
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "fallbacks": self.fallbacks,
+            "failures": self.failures,
+            "deadline_s": self.deadline,
+            "hedge": self.hedge,
+            "routes": {name: stats.as_dict() for name, stats in self._stats.items()},
+        }
+
+
+_chains: dict[str, ProviderChain] = {}
+
+
+def register_chain(operation: str, live_routes, fake_routes, deadline: float, hedge: bool) -> ProviderChain:
+    """Create the chain for an operation, using the local fakes when PROVIDER_MODE is "fake"."""
+    routes = fake_routes if settings.PROVIDER_MODE == "fake" else live_routes
+    chain = ProviderChain(operation, routes, deadline, hedge)
+    _chains[operation] = chain
+    return chain
+
+
+def provider_stats() -> dict:
+    return {"mode": settings.PROVIDER_MODE, "chains": {name: chain.stats() for name, chain in _chains.items()}}
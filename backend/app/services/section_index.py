@@ -0,0 +1,111 @@
+import math
+from collections import Counter
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from ..core.text import tokenize
+from ..models.page import Page
+from ..models.site import Site
+
+# Inflection-heavy uz/ru words share a short stem far more often than a full form ("narx"/"narxlar",
+# "компания"/"компании"). Each word is indexed as its prefix — a crude, language-agnostic stand-in
+# for a stemmer — plus the full word, so exact matches still rank first.
+STEM_LENGTH = 4
+HEADING_WEIGHT = 3
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def _terms(text: str) -> list[str]:
+    terms = []
+    for token in tokenize(text):
+        terms.append(token[:STEM_LENGTH])
+        if len(token) > STEM_LENGTH:
+            terms.append(token)
+    return terms
+
+
+def build_section_index(pages: list[dict]) -> dict:
+    """Build a BM25 index over section heading, summary and raw content.
+
+    `pages` are site-map shaped dicts whose sections also carry "content_raw". The result is plain
+    JSON so it can be stored on the site row.
+    """
+    docs = []
+    lengths = []
+    postings: dict[str, list[list[int]]] = {}
+
+    for page in pages:
+        for section in page.get("sections", []):
+            terms = (
+                _terms(section.get("heading", "")) * HEADING_WEIGHT
+                + _terms(section.get("content_summary", ""))
+                + _terms(section.get("content_raw", ""))
+            )
+            doc_id = len(docs)
+            docs.append([page["url"], section["section_id"]])
+            lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                postings.setdefault(term, []).append([doc_id, tf])
+
+    return {
+        "docs": docs,
+        "lengths": lengths,
+        "avgdl": sum(lengths) / len(lengths) if lengths else 0.0,
+        "postings": postings,
+    }
+
+
+def search_sections(index: dict, query: str, k: int) -> list[tuple[str, str]]:
+    """Return up to k (page url, section id) pairs ranked by BM25 relevance to the query."""
+    docs = index.get("docs") or []
+    if not docs or k <= 0:
+        return []
+    lengths = index["lengths"]
+    avgdl = index["avgdl"] or 1.0
+    postings = index["postings"]
+
+    scores: dict[int, float] = {}
+    for term in set(_terms(query)):
+        term_postings = postings.get(term)
+        if not term_postings:
+            continue
+        idf = math.log(1 + (len(docs) - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+        for doc_id, tf in term_postings:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc_id] / avgdl)
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+    ranked = sorted(scores, key=lambda d: (-scores[d], d))[:k]
+    return [tuple(docs[d]) for d in ranked]
+
+
+async def rebuild_section_index(db: AsyncSession, site_id: UUID) -> None:
+    """Recompute and store a site's section index from its current pages and sections."""
+    result = await db.execute(
+        select(Site)
+        .where(Site.id == site_id)
+        .options(selectinload(Site.pages).selectinload(Page.sections))
+    )
+    site = result.scalar_one_or_none()
+    if not site:
+        return
+
+    pages = [
+        {
+            "url": page.url,
+            "sections": [
+                {
+                    "section_id": s.section_id,
+                    "heading": s.heading,
+                    "content_summary": s.content_summary,
+                    "content_raw": s.content_raw,
+                }
+                for s in sorted(page.sections, key=lambda s: s.order)
+            ],
+        }
+        for page in site.pages
+    ]
+    site.section_index = build_section_index(pages)
@@ -1,15 +1,13 @@
-import google.generativeai as genai
+from functools import partial
 
 from ..config import settings
+from .fake_providers import fake_stt
+from .model_registry import get_model
+from .providers import register_chain
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
 
-
-async def transcribe_audio(
-    audio_bytes: bytes,
-    language_hints: list[str] | None = None,
-) -> dict:
-    model = genai.GenerativeModel("gemini-2.0-flash")
+async def _gemini_transcribe(model_name: str, audio_bytes: bytes, language_hints: list[str] | None) -> str:
+    model = get_model(model_name)
 
     hint_text = ""
     if language_hints:
@@ -24,7 +22,23 @@ async def transcribe_audio(
         ]
     )
 
-    transcript = response.text.strip()
+    return response.text.strip()
+
+
+_transcribe_chain = register_chain(
+    "stt",
+    [(f"gemini:{m}", partial(_gemini_transcribe, m)) for m in settings.STT_MODELS],
+    [("fake", fake_stt.transcribe)],
+    deadline=settings.STT_DEADLINE,
+    hedge=True,
+)
+
+
+async def transcribe_audio(
+    audio_bytes: bytes,
+    language_hints: list[str] | None = None,
+) -> dict:
+    transcript = await _transcribe_chain.call(audio_bytes, language_hints)
 
     # Detect language from transcribed text
     detected_language = _detect_language(transcript)
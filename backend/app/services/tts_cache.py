@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from ..config import settings
+from ..core.cache import register_cache
+
+logger = logging.getLogger(__name__)
+
+
+def tts_cache_key(text: str, language: str, voice: str, audio_format: str) -> str:
+    return hashlib.sha256(f"{text}\0{language}\0{voice}\0{audio_format}".encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Content-addressed audio cache: byte-bounded in-memory LRU in front of a size-capped directory.
+
+    The directory is shared by all API workers: any of them can read what another cached. Each
+    worker tracks the directory in an in-memory LRU index with a running byte total, so a write
+    evicts from the index instead of scanning the directory. The index is rebuilt from a scan on
+    first use and every rescan_interval seconds, which brings in files other workers wrote and
+    enforces the cap over the whole directory.
+    """
+
+    def __init__(self, memory_bytes: int, disk_dir: str, disk_bytes: int, rescan_interval: float):
+        self.memory_bytes = memory_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_bytes = disk_bytes
+        self.rescan_interval = rescan_interval
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_used = 0
+        self._disk_index: OrderedDict[str, int] = OrderedDict()  # key -> size, least recently used first
+        self._disk_used = 0
+        self._disk_scanned_at: float | None = None
+        self._disk_lock = asyncio.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.rescans = 0
+
+    async def get(self, key: str) -> bytes | None:
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            self.bytes_saved += len(audio)
+            return audio
+
+        audio = await self._disk_get(key)
+        if audio is not None:
+            self._memory_put(key, audio)
+            self.disk_hits += 1
+            self.bytes_saved += len(audio)
+            return audio
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, audio: bytes) -> None:
+        self._memory_put(key, audio)
+        await self._disk_put(key, audio)
+
+    def _memory_put(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_used -= len(old)
+        self._memory[key] = audio
+        self._memory_used += len(audio)
+        while self._memory_used > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted)
+
+    async def _disk_get(self, key: str) -> bytes | None:
+        if self.disk_dir is None:
+            return None
+        # Not checked against the index first: another worker may have cached it since the last scan
+        try:
+            audio = await asyncio.to_thread(self._read_file, self.disk_dir / key)
+        except FileNotFoundError:
+            self._index_remove(key)
+            return None
+        except OSError as e:
+            logger.warning(f"TTS cache read failed for {key}: {e}")
+            return None
+        self._index_add(key, len(audio))
+        return audio
+
+    async def _disk_put(self, key: str, audio: bytes) -> None:
+        if self.disk_dir is None or len(audio) > self.disk_bytes:
+            return
+        async with self._disk_lock:
+            try:
+                if self._disk_scanned_at is None or time.monotonic() - self._disk_scanned_at >= self.rescan_interval:
+                    await self._rescan()
+                await asyncio.to_thread(self._write_file, self.disk_dir / key, audio)
+                self._index_add(key, len(audio))
+                await self._evict_disk()
+            except OSError as e:
+                logger.warning(f"TTS cache write failed for {key}: {e}")
+
+    def _index_add(self, key: str, size: int) -> None:
+        self._disk_used += size - self._disk_index.pop(key, 0)
+        self._disk_index[key] = size
+
+    def _index_remove(self, key: str) -> None:
+        self._disk_used -= self._disk_index.pop(key, 0)
+
+    async def _evict_disk(self) -> None:
+        """Delete the least recently used indexed files until the directory fits disk_bytes."""
+        evicted = []
+        while self._disk_used > self.disk_bytes and self._disk_index:
+            key, size = self._disk_index.popitem(last=False)
+            self._disk_used -= size
+            evicted.append(self.disk_dir / key)
+        if evicted:
+            await asyncio.to_thread(lambda: [path.unlink(missing_ok=True) for path in evicted])
+
+    async def _rescan(self) -> None:
+        """Rebuild the index from the directory, oldest mtime first, and evict down to the cap."""
+        files = await asyncio.to_thread(self._scan_disk)
+        self._disk_index = OrderedDict((name, size) for _, name, size in sorted(files))
+        self._disk_used = sum(self._disk_index.values())
+        self._disk_scanned_at = time.monotonic()
+        self.rescans += 1
+        await self._evict_disk()
+
+    def _scan_disk(self) -> list[tuple[float, str, int]]:
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+        files = []
+        for item in os.scandir(self.disk_dir):
+            if item.name.endswith(".tmp"):
+                continue
+            try:
+                stat = item.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, item.name, stat.st_size))
+        return files
+
+    @staticmethod
+    def _read_file(path: Path) -> bytes:
+        audio = path.read_bytes()
+        # mtime orders eviction; atime can't be relied on (noatime/relatime mounts)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # Evicted by another worker since the read
+        return audio
+
+    @staticmethod
+    def _write_file(path: Path, audio: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(audio)
+        os.replace(tmp_path, path)
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_used,
+            "disk_entries": len(self._disk_index),
+            "disk_bytes": self._disk_used,
+            "disk_rescans": self.rescans,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+        }
+
+
+tts_cache = TTSCache(
+    memory_bytes=settings.TTS_CACHE_MEMORY_BYTES,
+    disk_dir=settings.TTS_CACHE_DIR,
+    disk_bytes=settings.TTS_CACHE_DISK_BYTES,
+    rescan_interval=settings.TTS_CACHE_RESCAN_INTERVAL,
+)
+register_cache("tts_audio", tts_cache)
@@ -1,43 +1,81 @@
 import base64
 import struct
+from functools import partial
 
-import httpx
 from google.cloud import texttospeech_v1
 
 from ..config import settings
+from .fake_providers import fake_tts
+from .provider_clients import provider_clients
+from .providers import register_chain
+from .tts_cache import tts_cache, tts_cache_key
 
+# "fallback" voices are plainer but served by a separate model backend
 VOICE_MAP = {
-    "en": {"language_code": "en-US", "name": "en-US-Chirp3-HD-Charon"},
-    "ru": {"language_code": "ru-RU", "name": "ru-RU-Chirp3-HD-Charon"},
+    "en": {"language_code": "en-US", "name": "en-US-Chirp3-HD-Charon", "fallback": "en-US-Neural2-D"},
+    "ru": {"language_code": "ru-RU", "name": "ru-RU-Chirp3-HD-Charon", "fallback": "ru-RU-Wavenet-D"},
 }
 
+UZBEK_VOICES = ["Kore", "Puck"]
+UZBEK_VOICE = UZBEK_VOICES[0]
+
 
 async def synthesize_speech(text: str, language: str = "en") -> bytes:
     if language == "uz":
-        return await synthesize_uzbek_with_gemini(text)
+        chain, voice_name, audio_format = _uzbek_chain, f"gemini:{UZBEK_VOICE}", "wav"
+    else:
+        chain, voice_name, audio_format = _google_chain, VOICE_MAP.get(language, VOICE_MAP["en"])["name"], "mp3"
+
+    key = tts_cache_key(text, language, voice_name, audio_format)
+    audio = await tts_cache.get(key)
+    if audio is not None:
+        return audio
+
+    audio, used_voice = await chain.call(text, language)
+
+    # Audio from a fallback voice is not cached, so the preferred voice is tried again next time
+    if used_voice == voice_name:
+        await tts_cache.put(key, audio)
+    return audio
+
+
+async def _google_tts_route(voice_key: str, text: str, language: str) -> tuple[bytes, str]:
+    voice_name = VOICE_MAP.get(language, VOICE_MAP["en"])[voice_key]
+    return await _synthesize_with_google_tts(text, language, voice_name), voice_name
+
 
-    client = texttospeech_v1.TextToSpeechAsyncClient()
+async def _gemini_tts_route(voice: str, text: str, language: str) -> tuple[bytes, str]:
+    return await synthesize_uzbek_with_gemini(text, voice), f"gemini:{voice}"
+
+
+async def _fake_tts_route(text: str, language: str) -> tuple[bytes, str]:
+    return await fake_tts.synthesize(text, language), "fake"
+
+
+async def _synthesize_with_google_tts(text: str, language: str, voice_name: str) -> bytes:
+    client = provider_clients.tts()
     voice_config = VOICE_MAP.get(language, VOICE_MAP["en"])
 
     input_text = texttospeech_v1.SynthesisInput(text=text)
     voice = texttospeech_v1.VoiceSelectionParams(
         language_code=voice_config["language_code"],
-        name=voice_config["name"],
+        name=voice_name,
     )
     audio_config = texttospeech_v1.AudioConfig(
         audio_encoding=texttospeech_v1.AudioEncoding.MP3,
     )
 
-    response = await client.synthesize_speech(
-        input=input_text,
-        voice=voice,
-        audio_config=audio_config,
-    )
+    async with provider_clients.track("google_tts"):
+        response = await client.synthesize_speech(
+            input=input_text,
+            voice=voice,
+            audio_config=audio_config,
+        )
 
     return response.audio_content
 
 
-async def synthesize_uzbek_with_gemini(text: str) -> bytes:
+async def synthesize_uzbek_with_gemini(text: str, voice: str = UZBEK_VOICE) -> bytes:
     url = (
         f"https://generativelanguage.googleapis.com/v1beta/models/"
         f"gemini-2.5-flash-preview-tts:generateContent?key={settings.GEMINI_API_KEY}"
@@ -50,16 +88,16 @@ async def synthesize_uzbek_with_gemini(text: str) -> bytes:
             "speechConfig": {
                 "voiceConfig": {
                     "prebuiltVoiceConfig": {
-                        "voiceName": "Kore"
+                        "voiceName": voice
                     }
                 }
             },
         },
     }
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        response = await client.post(url, json=payload)
-        response.raise_for_status()
+    async with provider_clients.track("gemini_tts"):
+        response = await provider_clients.http().post(url, json=payload)
+    response.raise_for_status()
 
     data = response.json()
     audio_part = data["candidates"][0]["content"]["parts"][0]["inlineData"]
@@ -69,6 +107,22 @@ async def synthesize_uzbek_with_gemini(text: str) -> bytes:
     return _pcm_to_wav(pcm_bytes, sample_rate=24000, channels=1, sample_width=2)
 
 
+_google_chain = register_chain(
+    "tts_google",
+    [("google:primary", partial(_google_tts_route, "name")), ("google:fallback", partial(_google_tts_route, "fallback"))],
+    [("fake", _fake_tts_route)],
+    deadline=settings.TTS_DEADLINE,
+    hedge=True,
+)
+_uzbek_chain = register_chain(
+    "tts_gemini",
+    [(f"gemini:{voice}", partial(_gemini_tts_route, voice)) for voice in UZBEK_VOICES],
+    [("fake", _fake_tts_route)],
+    deadline=settings.TTS_DEADLINE,
+    hedge=True,
+)
+
+
 def _pcm_to_wav(pcm_data: bytes, sample_rate: int, channels: int, sample_width: int) -> bytes:
     data_size = len(pcm_data)
     byte_rate = sample_rate * channels * sample_width
@@ -0,0 +1,138 @@
+"""Backfill or repair conversation_daily_stats and question_sketches from stored conversations.
+
+The conversation log writer keeps both current as turns are logged; run this once for
+conversations logged before the rollup existed, or to repair it. Conversations are read from the
+conversations table and from the archive, so history moved out by the retention task is kept.
+Rebuild a site while its widget is quiet and the retention task isn't running — turns written or
+archived during the rebuild may be counted twice.
+
+Rows are keyed like the writer's: each turn under its own day and language, and a conversation
+under its first turn's. Replies stamped with "at" and "language" give those keys; messages logged
+before replies were stamped fall back to the conversation's created_at day and final language.
+
+    python -m app.tasks.analytics_rollup_task [site_id]
+"""
+import asyncio
+import logging
+import sys
+from datetime import date, datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import delete, select
+
+from ..config import settings
+from ..models.conversation import Conversation
+from ..models.conversation_stats import ConversationDailyStats
+from ..models.question_sketch import QuestionSketch
+from ..models.site import Site
+from ..services.conversation_archive import ConversationArchive, conversation_archive
+from ..services.heavy_hitters import SpaceSaving, normalize_question
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_rollups(
+    session_factory, site_id: UUID | None = None, archive: ConversationArchive = conversation_archive
+) -> int:
+    """Recompute the daily rollup and question sketch for one site (or all sites); returns the number of conversations counted."""
+    rollup: dict[tuple, dict] = {}
+    sketches: dict[UUID, SpaceSaving] = {}
+    counted = 0
+
+    def count(conv_site_id, created_at, language, messages, actions):
+        sketch = sketches.setdefault(conv_site_id, SpaceSaving(settings.QUESTION_SKETCH_CAPACITY))
+        for key, stats in _turn_counts(created_at, language, messages, actions):
+            row = rollup.setdefault((conv_site_id, *key), {"conversations": 0, "messages": 0, "actions": 0})
+            for name, value in stats.items():
+                row[name] += value
+        for msg in messages or []:
+            if msg.get("role") == "user":
+                key = normalize_question(msg.get("content", ""))
+                if key:
+                    sketch.add(key, msg["content"].strip()[:300])
+
+    async with session_factory() as db:
+        site_ids = [site_id] if site_id is not None else list((await db.execute(select(Site.id))).scalars())
+
+        # A batch archived just before a crash is still in the table too; count it once
+        archived: set[str] = set()
+        for archived_site_id in site_ids:
+            async for row in archive.iter_conversations(archived_site_id):
+                archived.add(row["id"])
+                count(
+                    archived_site_id, datetime.fromisoformat(row["created_at"]), row["language"],
+                    row["messages"], row["actions_triggered"],
+                )
+                counted += 1
+
+        query = select(
+            Conversation.id,
+            Conversation.site_id,
+            Conversation.created_at,
+            Conversation.language,
+            Conversation.messages,
+            Conversation.actions_triggered,
+        )
+        if site_id is not None:
+            query = query.where(Conversation.site_id == site_id)
+        result = await db.stream(query.execution_options(yield_per=1000))
+        async for conversation_id, conv_site_id, created_at, language, messages, actions in result:
+            if str(conversation_id) in archived:
+                continue
+            count(conv_site_id, created_at, language, messages, actions)
+            counted += 1
+
+        clear = delete(ConversationDailyStats)
+        if site_id is not None:
+            clear = clear.where(ConversationDailyStats.site_id == site_id)
+        clear_sketches = delete(QuestionSketch)
+        if site_id is not None:
+            clear_sketches = clear_sketches.where(QuestionSketch.site_id == site_id)
+        await db.execute(clear)
+        await db.execute(clear_sketches)
+        db.add_all(
+            ConversationDailyStats(site_id=s, day=d, language=lang, **stats)
+            for (s, d, lang), stats in rollup.items()
+        )
+        db.add_all(QuestionSketch(site_id=s, sketch=sketch.to_dict()) for s, sketch in sketches.items())
+        await db.commit()
+
+    logger.info(f"Rebuilt conversation rollups from {counted} conversations ({len(rollup)} rows)")
+    return counted
+
+
+def _turn_counts(created_at: datetime, language: str | None, messages: list | None, actions: list | None):
+    """Yield ((day, language), increments) for one conversation, the way the writer counted its turns."""
+    fallback = (_utc_day(created_at), language or "en")
+    messages = messages or []
+    replies = [msg for msg in messages if msg.get("role") == "assistant"]
+    # The conversation counts where its first turn did
+    counted_first = bool(replies) and "at" in replies[0]
+    unstamped = {"conversations": int(not counted_first), "messages": len(messages), "actions": len(actions or [])}
+    for msg in replies:
+        if "at" not in msg:
+            continue
+        # A stamped reply closes a turn: the visitor's message and the reply
+        turn = {"conversations": int(counted_first), "messages": 2, "actions": msg.get("actions_added", 0)}
+        counted_first = False
+        unstamped["messages"] -= turn["messages"]
+        unstamped["actions"] -= turn["actions"]
+        yield (_utc_day(datetime.fromisoformat(msg["at"])), msg.get("language") or "en"), turn
+    if any(unstamped.values()):
+        yield fallback, unstamped
+
+
+def _utc_day(value: datetime) -> date:
+    # SQLite hands back naive datetimes; stored times are UTC
+    return value.astimezone(timezone.utc).date() if value.tzinfo else value.date()
+
+
+if __name__ == "__main__":
+    from ..core.database import async_session_factory, engine
+
+    async def main():
+        await rebuild_rollups(async_session_factory, UUID(sys.argv[1]) if len(sys.argv) > 1 else None)
+        await engine.dispose()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -1,22 +1,38 @@
 import asyncio
+import hashlib
+import json
 import logging
+from collections import defaultdict
 from datetime import datetime, timezone
 from uuid import UUID
 
 from slugify import slugify
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, undefer
 
+from ..config import settings
 from ..models.page import Page
 from ..models.section import Section
 from ..models.site import CrawlStatus, Site
+from ..services.chat_context import bump_content_version
+from ..services.crawl_profiles import resolve_profile
+from ..services.crawl_progress import CrawlProgressReporter
 from ..services.crawler_service import crawl_site
 from ..services.gemini_service import gemini_summarize
+from ..services.section_index import rebuild_section_index
 
 logger = logging.getLogger(__name__)
 
 
 async def run_crawl_task(site_id: UUID, session_factory) -> None:
+    """Crawl a site and bring its stored pages and sections up to date.
+
+    Re-crawls are incremental: pages answer conditional requests with the validators stored
+    last time, pages whose extracted content hashes the same are only touched, and sections
+    keep their rows and summaries when their content is unchanged. Only new or changed sections
+    are summarized, and an unchanged site skips the index rebuild and content version bump.
+    """
     async with session_factory() as db:
         result = await db.execute(select(Site).where(Site.id == site_id))
         site = result.scalar_one_or_none()
@@ -27,55 +43,204 @@ async def run_crawl_task(site_id: UUID, session_factory) -> None:
         site.crawl_status = CrawlStatus.crawling
         await db.commit()
 
-        try:
-            pages_data = await crawl_site(site.url, max_pages=50)
+        progress = CrawlProgressReporter(session_factory, site_id)
+        await progress.start()
 
-            existing_pages = await db.execute(select(Page).where(Page.site_id == site_id))
-            for old_page in existing_pages.scalars():
+        try:
+            existing_result = await db.execute(
+                select(Page)
+                .where(Page.site_id == site_id)
+                .options(selectinload(Page.sections), undefer(Page.links))
+            )
+            existing_pages = existing_result.scalars().all()
+            existing: dict[str, Page] = {}
+            for page in existing_pages:
+                existing.setdefault(page.url, page)
+            previous = {
+                url: {
+                    "etag": page.etag,
+                    "last_modified": page.last_modified,
+                    "links": page.links,
+                    "sections": [{"heading": s.heading} for s in page.sections],
+                }
+                for url, page in existing.items()
+                if page.links is not None
+            }
+
+            pages_data = await crawl_site(
+                site.url,
+                max_pages=settings.CRAWL_MAX_PAGES,
+                progress=progress,
+                profile=resolve_profile(site.crawl_profile),
+                previous=previous,
+            )
+            crawled_at = datetime.now(timezone.utc)
+
+            # Summaries are reused for any section whose content is unchanged, wherever it appears
+            # on the site; raw-text fallbacks left by failed summarization are retried
+            summaries = {
+                _stored_section_hash(section): section.content_summary
+                for page in existing_pages
+                for section in page.sections
+                if not _is_fallback_summary(section)
+            }
+
+            kept: set[UUID] = set()
+            changed: list[tuple[Page | None, dict, str]] = []
+            for page_data in pages_data:
+                db_page = existing.get(page_data["url"])
+                if db_page is not None:
+                    kept.add(db_page.id)
+                if db_page is not None and page_data.get("not_modified"):
+                    _touch_page(db_page, page_data, crawled_at)
+                    await progress.add(pages_unchanged=1, sections_reused=len(db_page.sections))
+                    continue
+                content_hash = _page_hash(page_data)
+                if db_page is not None and db_page.content_hash == content_hash:
+                    _touch_page(db_page, page_data, crawled_at)
+                    await progress.add(pages_unchanged=1, sections_reused=len(db_page.sections))
+                    continue
+                changed.append((db_page, page_data, content_hash))
+
+            pending: dict[str, str] = {}
+            for _, page_data, _ in changed:
+                for section_data in page_data.get("sections", []):
+                    section_hash = _section_hash(section_data)
+                    if section_hash in summaries:
+                        progress.counts["sections_reused"] += 1
+                    else:
+                        pending.setdefault(section_hash, section_data.get("content", ""))
+
+            progress.counts["sections_total"] = len(pending)
+            await progress.set_stage("summarizing")
+
+            for section_hash, content_raw in pending.items():
+                try:
+                    summaries[section_hash] = await gemini_summarize(content_raw)
+                except Exception as e:
+                    logger.warning(f"Summarization failed for section: {e}")
+                    summaries[section_hash] = content_raw[:500]
+                await progress.add(sections_summarized=1)
+
+            removed = [page for page in existing_pages if page.id not in kept]
+            for old_page in removed:
                 await db.delete(old_page)
-            await db.flush()
 
-            for page_data in pages_data:
-                db_page = Page(
-                    site_id=site_id,
-                    url=page_data["url"],
-                    title=page_data["title"],
-                    meta_description=page_data.get("meta_description"),
-                )
-                db.add(db_page)
-                await db.flush()
+            for db_page, page_data, content_hash in changed:
+                if db_page is None:
+                    db_page = Page(site_id=site_id, url=page_data["url"], sections=[])
+                    db.add(db_page)
+                _save_page(db_page, page_data, content_hash, summaries, crawled_at)
+                await progress.add(pages_saved=1)
 
-                for idx, section_data in enumerate(page_data.get("sections", [])):
-                    content_raw = section_data.get("content", "")
-                    try:
-                        content_summary = await gemini_summarize(content_raw)
-                    except Exception as e:
-                        logger.warning(f"Summarization failed for section: {e}")
-                        content_summary = content_raw[:500]
-
-                    section_id = section_data.get("id")
-                    if not section_id:
-                        heading_slug = slugify(section_data.get("heading", f"section-{idx}"))
-                        section_id = f"#section-{heading_slug}"
-
-                    db_section = Section(
-                        page_id=db_page.id,
-                        section_id=section_id,
-                        heading=section_data.get("heading", ""),
-                        content_summary=content_summary,
-                        content_raw=content_raw,
-                        order=idx,
-                    )
-                    db.add(db_section)
+            if changed or removed:
+                await progress.set_stage("indexing")
+                await db.flush()
+                await rebuild_section_index(db, site_id)
+                await bump_content_version(db, site_id)
 
             site.crawl_status = CrawlStatus.completed
-            site.last_crawled_at = datetime.now(timezone.utc)
+            site.last_crawled_at = crawled_at
             await db.commit()
-            logger.info(f"Crawl completed for site {site_id}: {len(pages_data)} pages")
+            await progress.finish()
+            logger.info(
+                f"Crawl completed for site {site_id}: {len(pages_data)} pages "
+                f"({len(changed)} new or changed, {progress.counts['pages_unchanged']} unchanged, "
+                f"{len(removed)} removed); {progress.counts['sections_reused']} sections reused, "
+                f"{len(pending)} summarized"
+            )
 
         except Exception as e:
             logger.error(f"Crawl failed for site {site_id}: {e}")
-            site.crawl_status = CrawlStatus.failed
-            await db.commit()
-
-
+            # The session may hold a failed flush; discard it so the site can still be marked failed
+            await db.rollback()
+            try:
+                await db.execute(
+                    update(Site).where(Site.id == site_id).values(crawl_status=CrawlStatus.failed)
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            except Exception as mark_error:
+                logger.error(f"Could not mark crawl of site {site_id} as failed: {mark_error}")
+            await progress.finish(error=str(e))
+
+
+def _section_hash(section_data: dict) -> str:
+    text = f"{section_data.get('heading', '')}\n{section_data.get('content', '')}"
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _stored_section_hash(section: Section) -> str:
+    # Sections saved before hashes were stored fall back to their raw content
+    return section.content_hash or _section_hash({"heading": section.heading, "content": section.content_raw})
+
+
+def _is_fallback_summary(section: Section) -> bool:
+    # An empty section's summary is empty too; that's final, not a fallback to retry
+    return bool(section.content_raw) and section.content_summary == section.content_raw[:500]
+
+
+def _page_hash(page_data: dict) -> str:
+    content = [
+        page_data["title"],
+        page_data.get("meta_description"),
+        [(s.get("id"), _section_hash(s)) for s in page_data.get("sections", [])],
+    ]
+    return hashlib.sha256(json.dumps(content).encode()).hexdigest()
+
+
+def _touch_page(page: Page, page_data: dict, crawled_at: datetime) -> None:
+    page.crawled_at = crawled_at
+    page.etag = _validator(page_data.get("etag"), Page.etag)
+    page.last_modified = _validator(page_data.get("last_modified"), Page.last_modified)
+    page.links = page_data["links"]
+
+
+def _validator(value: str | None, column) -> str | None:
+    # A cut-off validator would never match again, so one too long for its column isn't kept
+    if value is None or len(value) > column.type.length:
+        return None
+    return value
+
+
+def _save_page(
+    page: Page, page_data: dict, content_hash: str, summaries: dict[str, str], crawled_at: datetime
+) -> None:
+    """Update a page from fresh crawl data, keeping the rows (and summaries) of unchanged sections."""
+    page.title = page_data["title"]
+    page.meta_description = page_data.get("meta_description")
+    page.content_hash = content_hash
+    _touch_page(page, page_data, crawled_at)
+
+    old_sections: dict[str, list[Section]] = defaultdict(list)
+    for section in page.sections:
+        old_sections[_stored_section_hash(section)].append(section)
+
+    sections = []
+    for idx, section_data in enumerate(page_data.get("sections", [])):
+        section_hash = _section_hash(section_data)
+        section_id = section_data.get("id")
+        if not section_id:
+            heading_slug = slugify(section_data.get("heading", f"section-{idx}"))
+            section_id = f"#section-{heading_slug}"
+
+        if old_sections[section_hash]:
+            section = old_sections[section_hash].pop(0)
+            if _is_fallback_summary(section):
+                section.content_summary = summaries[section_hash]
+            section.section_id = section_id
+            section.order = idx
+            section.content_hash = section_hash
+        else:
+            content_raw = section_data.get("content", "")
+            section = Section(
+                section_id=section_id,
+                heading=section_data.get("heading", ""),
+                content_summary=summaries[section_hash],
+                content_raw=content_raw,
+                order=idx,
+                content_hash=section_hash,
+            )
+        sections.append(section)
+    # Sections no longer on the page are deleted as orphans
+    page.sections = sections
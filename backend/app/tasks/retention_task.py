@@ -0,0 +1,91 @@
+"""Move conversations past their plan's retention window from the conversations table into the archive.
+
+Runs periodically in the crawler worker; can also be run by hand:
+
+    python -m app.tasks.retention_task
+
+Daily rollups and question sketches are left alone, so analytics still cover archived history.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, or_, select
+
+from ..config import settings
+from ..models.conversation import Conversation
+from ..models.site import Site
+from ..models.user import User
+from ..services.conversation_archive import ConversationArchive, retention_days, serialize_conversation
+
+logger = logging.getLogger(__name__)
+
+
+async def archive_expired(session_factory, archive: ConversationArchive, now: datetime | None = None) -> int:
+    """Archive and delete every expired conversation; returns how many were moved."""
+    now = now or datetime.now(timezone.utc)
+    async with session_factory() as db:
+        sites = (await db.execute(select(Site.id, User.plan).join(User, Site.user_id == User.id))).all()
+
+    moved = 0
+    for site_id, plan in sites:
+        cutoff = now - timedelta(days=retention_days(plan))
+        while True:
+            archived = await _archive_batch(session_factory, archive, site_id, cutoff)
+            moved += archived
+            if archived < settings.RETENTION_BATCH_SIZE:
+                break
+    logger.info(f"Archived {moved} expired conversations across {len(sites)} sites")
+    return moved
+
+
+async def _archive_batch(session_factory, archive: ConversationArchive, site_id, cutoff: datetime) -> int:
+    async with session_factory() as db:
+        result = await db.execute(
+            select(Conversation)
+            .where(
+                Conversation.site_id == site_id,
+                Conversation.created_at < cutoff,
+                # Leave conversations that are still being added to
+                or_(Conversation.ended_at.is_(None), Conversation.ended_at < cutoff),
+            )
+            .order_by(Conversation.created_at, Conversation.id)
+            .limit(settings.RETENTION_BATCH_SIZE)
+        )
+        batch = result.scalars().all()
+        if not batch:
+            return 0
+
+        by_month: dict[str, list[dict]] = defaultdict(list)
+        for conversation in batch:
+            row = serialize_conversation(conversation)
+            by_month[row["created_at"][:7]].append(row)
+        # Segments are durable before the rows they hold are deleted
+        for month, rows in by_month.items():
+            await asyncio.to_thread(archive.write_segment, site_id, month, rows)
+
+        await db.execute(delete(Conversation).where(Conversation.id.in_([c.id for c in batch])))
+        await db.commit()
+        return len(batch)
+
+
+async def retention_forever(session_factory, archive: ConversationArchive) -> None:
+    while True:
+        try:
+            await archive_expired(session_factory, archive)
+        except Exception as e:
+            logger.error(f"Retention run failed: {e}")
+        await asyncio.sleep(settings.RETENTION_INTERVAL)
+
+
+if __name__ == "__main__":
+    from ..core.database import async_session_factory, engine
+    from ..services.conversation_archive import conversation_archive
+
+    async def main():
+        await archive_expired(async_session_factory, conversation_archive)
+        await engine.dispose()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
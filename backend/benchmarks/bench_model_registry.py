@@ -0,0 +1,39 @@
+"""Per-call overhead of building a GenerativeModel vs. reusing one from the registry.
+
+Run from backend/: python -m benchmarks.bench_model_registry
+No network access is needed — model construction is local.
+"""
+import timeit
+
+import google.generativeai as genai
+
+from app.core.prompts import build_system_prompt
+from app.services.gemini_service import WIDGET_TOOLS
+from app.services.model_registry import get_model
+
+from .data import synthetic_site_map
+
+ITERATIONS = 2000
+
+
+def main():
+    for pages in (10, 50):
+        prompt = build_system_prompt(synthetic_site_map(pages), {"greeting_message": "Hello!"}, "en")
+
+        def per_request():
+            genai.GenerativeModel(model_name="gemini-2.0-flash", system_instruction=prompt, tools=WIDGET_TOOLS)
+
+        def registry():
+            get_model("gemini-2.0-flash", system_instruction=prompt, tools=WIDGET_TOOLS)
+
+        before = timeit.timeit(per_request, number=ITERATIONS) / ITERATIONS
+        after = timeit.timeit(registry, number=ITERATIONS) / ITERATIONS
+        print(
+            f"pages={pages:<3} prompt={len(prompt):>6} chars  "
+            f"per-request={before * 1e6:8.1f}us  registry={after * 1e6:8.1f}us  "
+            f"speedup={before / after:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
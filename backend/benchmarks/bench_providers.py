@@ -0,0 +1,55 @@
+"""Tail latency of a provider chain with and without hedging, against the fake providers.
+
+Run from backend/: python -m benchmarks.bench_providers [--calls 500] [--concurrency 20]
+Fully offline: every call goes to a seeded fake with a lognormal latency distribution.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.config import settings
+from app.services.fake_providers import FakeLLM, LatencyDistribution
+from app.services.providers import ProviderChain
+
+LATENCY = "lognormal:0.05:0.8"  # heavy tail: p99 is roughly 6x the median
+
+
+async def run(hedge: bool, calls: int, concurrency: int, failure_rate: float) -> list[float]:
+    llm = FakeLLM(LatencyDistribution(LATENCY, failure_rate, seed=1))
+    fallback = FakeLLM(LatencyDistribution(LATENCY, failure_rate, seed=2))
+    chain = ProviderChain("bench", [("primary", llm.generate), ("fallback", fallback.generate)], deadline=5, hedge=hedge)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await chain.call("prompt")
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    print(f"hedge={hedge!s:<5} {_quantiles(latencies)}  {chain.stats()['routes']['primary']}")
+    return latencies
+
+
+def _quantiles(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000
+    return f"p50={pick(0.5):6.1f}ms p95={pick(0.95):6.1f}ms p99={pick(0.99):6.1f}ms mean={statistics.fmean(samples) * 1000:6.1f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--failure-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    settings.PROVIDER_HEDGE_ENABLED = True
+    for hedge in (False, True):
+        asyncio.run(run(hedge, args.calls, args.concurrency, args.failure_rate))
+
+
+if __name__ == "__main__":
+    main()
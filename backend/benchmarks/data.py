@@ -0,0 +1,120 @@
+"""Synthetic sites and conversation histories for the benchmarks."""
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
+from app.models.conversation import Conversation
+from app.models.page import Page
+from app.models.section import Section
+from app.models.site import Site
+from app.models.user import User
+
+SECTIONS_PER_PAGE = 5
+
+_SUMMARY = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 3
+
+MESSAGES = {
+    "en": ["What are your prices?", "How do I contact support?", "Do you ship to Tashkent?", "Show me the pricing page"],
+    "ru": ["Сколько стоит доставка?", "Как с вами связаться?", "Есть ли скидки для студентов?", "Покажите контакты"],
+    "uz": ["Narxi qancha?", "Sizga qanday bog'lanish mumkin?", "Yetkazib berish bormi?", "Oʻzbekcha maʼlumot kerak"],
+}
+
+
+def synthetic_site_map(pages: int) -> dict:
+    return {
+        "site_name": "Bench Site",
+        "site_url": "https://bench.example",
+        "pages": [
+            {
+                "url": f"/page-{p}",
+                "title": f"Page {p}",
+                "sections": [
+                    {
+                        "section_id": f"#section-{s}",
+                        "heading": f"Heading {p}.{s}",
+                        "content_summary": _SUMMARY,
+                    }
+                    for s in range(SECTIONS_PER_PAGE)
+                ],
+            }
+            for p in range(pages)
+        ],
+    }
+
+
+def synthetic_sections(count: int) -> list[dict]:
+    return [{"heading": f"Heading {i}", "content": _SUMMARY} for i in range(count)]
+
+
+def message_corpus(seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    corpus = [m for messages in MESSAGES.values() for m in messages]
+    rng.shuffle(corpus)
+    return corpus
+
+
+async def create_user(db) -> User:
+    user = User(email=f"bench-{uuid.uuid4().hex[:8]}@bench.example", hashed_password="x", full_name="Bench")
+    db.add(user)
+    await db.flush()
+    return user
+
+
+async def seed_site(db, user: User, pages: int) -> uuid.UUID:
+    """Create a site with `pages` pages of SECTIONS_PER_PAGE sections each."""
+    site = Site(user_id=user.id, name=f"Bench {pages}", url="https://bench.example", api_key=uuid.uuid4().hex)
+    db.add(site)
+    await db.flush()
+
+    page_rows = [
+        {"id": uuid.uuid4(), "site_id": site.id, "url": f"/page-{p}", "title": f"Page {p}"} for p in range(pages)
+    ]
+    await db.execute(insert(Page), page_rows)
+    section_rows = [
+        {
+            "id": uuid.uuid4(),
+            "page_id": page["id"],
+            "section_id": f"#section-{s}",
+            "heading": f"Heading {p}.{s}",
+            "content_summary": _SUMMARY,
+            "content_raw": _SUMMARY,
+            "order": s,
+        }
+        for p, page in enumerate(page_rows)
+        for s in range(SECTIONS_PER_PAGE)
+    ]
+    for start in range(0, len(section_rows), 5000):
+        await db.execute(insert(Section), section_rows[start:start + 5000])
+    await db.commit()
+    return site.id
+
+
+async def seed_conversations(db, site_id: uuid.UUID, count: int, offset: int = 0, chunk: int = 5000) -> None:
+    """Insert `count` two-turn conversations spread over the past year, deterministically from `offset`."""
+    now = datetime.now(timezone.utc)
+    languages = list(MESSAGES)
+    for start in range(offset, offset + count, chunk):
+        rows = []
+        for i in range(start, min(start + chunk, offset + count)):
+            language = languages[i % len(languages)]
+            question = MESSAGES[language][i % len(MESSAGES[language])]
+            created_at = now - timedelta(minutes=(i * 7919) % (365 * 24 * 60))
+            rows.append({
+                "id": uuid.uuid4(),
+                "site_id": site_id,
+                "visitor_id": f"visitor-{i}",
+                "messages": [
+                    {"role": "user", "content": question},
+                    {"role": "assistant", "content": "Here is what I found."},
+                    {"role": "user", "content": question},
+                    {"role": "assistant", "content": "Anything else?"},
+                ],
+                "language": language,
+                "actions_triggered": [{"type": "navigate_to_page", "params": {"url": "/pricing"}}] if i % 3 == 0 else [],
+                "created_at": created_at,
+                "ended_at": created_at + timedelta(minutes=2),
+            })
+        await db.execute(insert(Conversation), rows)
+        await db.commit()
@@ -0,0 +1,113 @@
+"""Timing, result files and comparison for the benchmark suite."""
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+MIN_TIME = 0.5  # seconds of measurement per benchmark case
+MIN_ITERATIONS = 3
+MAX_ITERATIONS = 10000
+
+
+def _summarize(name: str, params: dict, samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "benchmark": name,
+        "params": params,
+        "iterations": len(samples),
+        "mean_s": statistics.fmean(samples),
+        "median_s": statistics.median(samples),
+        "min_s": ordered[0],
+        "p95_s": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+    }
+
+
+def measure(name: str, params: dict, fn) -> dict:
+    samples = []
+    deadline = time.perf_counter() + MIN_TIME
+    while len(samples) < MIN_ITERATIONS or (time.perf_counter() < deadline and len(samples) < MAX_ITERATIONS):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return _report(_summarize(name, params, samples))
+
+
+async def ameasure(name: str, params: dict, fn) -> dict:
+    samples = []
+    deadline = time.perf_counter() + MIN_TIME
+    while len(samples) < MIN_ITERATIONS or (time.perf_counter() < deadline and len(samples) < MAX_ITERATIONS):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return _report(_summarize(name, params, samples))
+
+
+def single(name: str, params: dict, seconds: float) -> dict:
+    """Record a one-shot timing (setup steps too slow to repeat)."""
+    return _report(_summarize(name, params, [seconds]))
+
+
+def _report(result: dict) -> dict:
+    params = " ".join(f"{k}={v}" for k, v in result["params"].items())
+    print(f"{result['benchmark']:<28} {params:<32} mean={_fmt(result['mean_s'])}  p95={_fmt(result['p95_s'])}  n={result['iterations']}")
+    return result
+
+
+def _fmt(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:8.1f}us"
+    if seconds < 1:
+        return f"{seconds * 1e3:8.2f}ms"
+    return f"{seconds:8.2f}s "
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: Path, results: list[dict], database: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "database": database,
+        },
+        "results": results,
+    }
+    path.write_text(json.dumps(payload, indent=2))
+    print(f"\nWrote {len(results)} results to {path}")
+
+
+def compare(baseline_path: Path, results: list[dict], threshold: float) -> int:
+    """Print median-time ratios against a baseline file; returns how many cases regressed past `threshold`."""
+    baseline = {
+        (r["benchmark"], json.dumps(r["params"], sort_keys=True)): r
+        for r in json.loads(baseline_path.read_text())["results"]
+    }
+    regressions = 0
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        before = baseline.get((result["benchmark"], json.dumps(result["params"], sort_keys=True)))
+        if before is None or not before["median_s"]:
+            continue
+        # Medians shrug off the odd GC pause or noisy neighbour that skews means
+        ratio = result["median_s"] / before["median_s"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        params = " ".join(f"{k}={v}" for k, v in result["params"].items())
+        print(f"{result['benchmark']:<28} {params:<32} {ratio:6.2f}x{flag}")
+    return regressions
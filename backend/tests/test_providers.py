@@ -0,0 +1,113 @@
+"""ProviderChain fallback, deadline and hedging behaviour, driven by the local fake providers.
+
+Run from backend/: python -m pytest tests
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.config import settings
+from app.services.fake_providers import FakeLLM, FakeTTS, LatencyDistribution
+from app.services.providers import ProviderChain, ProviderError
+
+
+def _llm(spec: str = "constant:0.01", failure_rate: float = 0.0) -> FakeLLM:
+    return FakeLLM(LatencyDistribution(spec, failure_rate, seed=0))
+
+
+def _chat(chain: ProviderChain):
+    return asyncio.run(chain.call("hello", [], "system", "en"))
+
+
+def test_primary_route_answers_without_fallback():
+    chain = ProviderChain("llm_chat", [("primary", _llm().chat), ("backup", _llm().chat)], deadline=1, hedge=False)
+
+    assert _chat(chain)["text"] == "[fake en] You said: hello"
+    stats = chain.stats()
+    assert stats["fallbacks"] == 0
+    assert stats["routes"]["primary"]["successes"] == 1
+    assert stats["routes"]["backup"]["attempts"] == 0
+
+
+def test_failed_route_falls_back_to_the_next():
+    chain = ProviderChain(
+        "llm_chat", [("primary", _llm(failure_rate=1.0).chat), ("backup", _llm().chat)], deadline=1, hedge=False
+    )
+
+    assert _chat(chain)["language"] == "en"
+    stats = chain.stats()
+    assert stats["fallbacks"] == 1
+    assert stats["routes"]["primary"]["errors"] == 1
+    assert stats["routes"]["backup"]["successes"] == 1
+
+
+def test_all_routes_failing_raises_provider_error():
+    chain = ProviderChain(
+        "llm_chat",
+        [("primary", _llm(failure_rate=1.0).chat), ("backup", _llm(failure_rate=1.0).chat)],
+        deadline=1,
+        hedge=False,
+    )
+
+    with pytest.raises(ProviderError):
+        _chat(chain)
+    assert chain.stats()["failures"] == 1
+
+
+def test_primary_route_gets_most_of_the_deadline(monkeypatch):
+    monkeypatch.setattr(settings, "PROVIDER_PRIMARY_SHARE", 0.75)
+    slow = FakeTTS(LatencyDistribution("constant:5", 0.0, seed=0))
+    fast = FakeTTS(LatencyDistribution("constant:0.01", 0.0, seed=0))
+    chain = ProviderChain("tts", [("primary", slow.synthesize), ("backup", fast.synthesize)], deadline=0.4, hedge=False)
+
+    started = time.monotonic()
+    assert asyncio.run(chain.call("hello", "en")).startswith(b"RIFF")
+    elapsed = time.monotonic() - started
+
+    # The slow primary is cut off after 75% of the deadline, not half of it
+    assert 0.28 <= elapsed < 0.4
+    assert chain.stats()["routes"]["primary"]["timeouts"] == 1
+
+
+def test_deadline_bounds_the_whole_chain():
+    slow = _llm("constant:5")
+    chain = ProviderChain("llm_chat", [("primary", slow.chat), ("backup", slow.chat)], deadline=0.2, hedge=False)
+
+    started = time.monotonic()
+    with pytest.raises(ProviderError):
+        _chat(chain)
+    assert time.monotonic() - started < 0.4
+
+
+def test_slow_attempt_is_hedged_and_the_hedge_wins(monkeypatch):
+    monkeypatch.setattr(settings, "PROVIDER_HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "PROVIDER_HEDGE_DEFAULT_DELAY", 0.05)
+    delays = iter([5.0, 0.01])
+
+    async def flaky(*args):
+        await asyncio.sleep(next(delays))
+        return "ok"
+
+    chain = ProviderChain("llm_chat", [("primary", flaky)], deadline=1, hedge=True)
+
+    started = time.monotonic()
+    assert asyncio.run(chain.call()) == "ok"
+    assert time.monotonic() - started < 0.5
+    route = chain.stats()["routes"]["primary"]
+    assert (route["hedges"], route["hedge_wins"]) == (1, 1)
+
+
+def test_stream_falls_back_before_the_first_event():
+    chain = ProviderChain(
+        "llm_stream",
+        [("primary", _llm(failure_rate=1.0).stream_chat), ("backup", _llm().stream_chat)],
+        deadline=1,
+        hedge=False,
+    )
+
+    async def collect():
+        return "".join([text async for _, text in chain.stream("hi", [], "system", "ru")])
+
+    assert asyncio.run(collect()).strip() == "[fake ru] You said: hi"
+    assert chain.stats()["fallbacks"] == 1
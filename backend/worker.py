@@ -6,7 +6,9 @@ from sqlalchemy import select
 
 from app.core.database import async_session_factory
 from app.models.site import CrawlStatus, Site
+from app.services.conversation_archive import conversation_archive
 from app.tasks.crawl_task import run_crawl_task
+from app.tasks.retention_task import retention_forever
 
 logging.basicConfig(
     level=logging.INFO,
@@ -34,5 +36,13 @@ async def poll_forever():
         await asyncio.sleep(POLL_INTERVAL)
 
 
+async def main():
+    # Retention runs here rather than in the API, which may have several uvicorn workers
+    await asyncio.gather(
+        poll_forever(),
+        retention_forever(async_session_factory, conversation_archive),
+    )
+
+
 if __name__ == "__main__":
-    asyncio.run(poll_forever())
+    asyncio.run(main())
@@ -6,7 +6,10 @@ export default function CrawlProgress({ siteId }: { siteId: string }) {
 
   if (!status) return null;
 
-  const progress = status.total_pages > 0 ? (status.pages_crawled / status.total_pages) * 100 : 0;
+  // Fetching pages fills the first half of the bar, summarizing their sections the second
+  const fetched = status.total_pages > 0 ? status.pages_crawled / status.total_pages : 0;
+  const summarized = status.sections_total > 0 ? status.sections_summarized / status.sections_total : 0;
+  const progress = status.stage === 'crawling' ? fetched * 50 : 50 + summarized * 50;
 
   return (
     <div className="space-y-3">
@@ -19,7 +22,12 @@ export default function CrawlProgress({ siteId }: { siteId: string }) {
           <div className="w-full bg-gray-200 rounded-full h-2">
             <div className="bg-primary h-2 rounded-full transition-all" style={{ width: `${progress}%` }} />
           </div>
-          <p className="text-xs text-gray-500">{status.pages_crawled} / {status.total_pages} pages crawled</p>
+          <p className="text-xs text-gray-500">
+            {status.stage === 'crawling' || !status.stage
+              ? `${status.pages_crawled} / ${status.total_pages} pages crawled`
+              : `${status.sections_summarized} / ${status.sections_total} sections summarized` +
+                (status.sections_reused > 0 ? ` (${status.sections_reused} unchanged)` : '')}
+          </p>
         </>
       )}
     </div>
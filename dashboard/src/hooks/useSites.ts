@@ -1,3 +1,4 @@
+import { useEffect } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import api from '@/lib/api';
 import type { Site, SiteMap, CrawlStatus, AnalyticsData, WidgetConfig } from '@/types';
@@ -35,18 +36,84 @@ export function useSiteMap(id: string) {
 }
 
 export function useCrawlStatus(id: string, enabled = true) {
-  return useQuery<CrawlStatus>({
+  const queryClient = useQueryClient();
+  const query = useQuery<CrawlStatus>({
     queryKey: ['crawlStatus', id],
     queryFn: async () => {
       const { data } = await api.get(`/crawl/${id}/status`);
       return data;
     },
     enabled: !!id && enabled,
-    refetchInterval: (query) => {
-      const status = query.state.data?.status;
-      return status === 'crawling' || status === 'pending' ? 2000 : false;
-    },
   });
+
+  // While a crawl runs, the server pushes progress over SSE instead of us polling /status
+  const active = isCrawlActive(query.data);
+  useEffect(() => {
+    if (!id || !enabled || !active) return;
+    const controller = new AbortController();
+    const { signal } = controller;
+    (async () => {
+      let attempt = 0;
+      for (;;) {
+        const connected = await streamCrawlEvents(id, signal, (status) =>
+          queryClient.setQueryData(['crawlStatus', id], status),
+        ).catch(() => false);
+        if (signal.aborted) return;
+        // The stream closes when the crawl finishes, but also on the server's stream timeout, a proxy
+        // cutting it or an error response; refetch, and re-subscribe if the crawl is still running
+        await queryClient.invalidateQueries({ queryKey: ['crawlStatus', id] });
+        queryClient.invalidateQueries({ queryKey: ['sites', id] });
+        if (signal.aborted || !isCrawlActive(queryClient.getQueryData<CrawlStatus>(['crawlStatus', id]))) return;
+        attempt = connected ? 0 : attempt + 1;
+        await sleep(Math.min(1000 * 2 ** attempt, 30000), signal);
+        if (signal.aborted) return;
+      }
+    })();
+    return () => controller.abort();
+  }, [id, enabled, active, queryClient]);
+
+  return query;
+}
+
+function isCrawlActive(status: CrawlStatus | undefined) {
+  return status?.status === 'crawling' || status?.status === 'pending';
+}
+
+function sleep(ms: number, signal: AbortSignal) {
+  return new Promise<void>((resolve) => {
+    const timer = setTimeout(resolve, ms);
+    signal.addEventListener('abort', () => {
+      clearTimeout(timer);
+      resolve();
+    }, { once: true });
+  });
+}
+
+/** Read the crawl's SSE stream until it closes; resolves false if the server refused the stream. */
+async function streamCrawlEvents(id: string, signal: AbortSignal, onProgress: (status: CrawlStatus) => void) {
+  // EventSource cannot send the Authorization header, so read the SSE stream with fetch
+  const token = localStorage.getItem('token');
+  const response = await fetch(`${api.defaults.baseURL}/crawl/${id}/events`, {
+    headers: token ? { Authorization: `Bearer ${token}` } : {},
+    signal,
+  });
+  if (!response.ok || !response.body) return false;
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) return true;
+    buffer += value;
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const message = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      const event = message.match(/^event: (.*)$/m)?.[1];
+      const data = message.match(/^data: (.*)$/m)?.[1];
+      if (event === 'progress' && data) onProgress(JSON.parse(data));
+    }
+  }
 }
 
 export function useAnalytics(id: string) {
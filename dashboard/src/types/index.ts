@@ -55,9 +55,20 @@ export interface WidgetConfig {
 export interface CrawlStatus {
   site_id: string;
   status: string;
+  stage: string | null;
   pages_crawled: number;
   total_pages: number;
+  static_fetches: number;
+  browser_fetches: number;
+  pages_saved: number;
+  pages_unchanged: number;
+  sections_reused: number;
+  sections_total: number;
+  sections_summarized: number;
+  error: string | null;
   started_at: string | null;
+  updated_at: string | null;
+  finished_at: string | null;
 }
 
 export interface AnalyticsData {
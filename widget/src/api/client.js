@@ -18,7 +18,7 @@ export class ApiClient {
     return res.json();
   }
 
-  async chat(message, conversationHistory, language, currentUrl) {
+  async chat(message, conversationHistory, language, currentUrl, conversationId = null, conversationUpdatedAt = null) {
     const res = await fetch(`${this.apiBase}/api/v1/widget/chat`, {
       method: 'POST',
       headers: {
@@ -27,6 +27,8 @@ export class ApiClient {
       },
       body: JSON.stringify({
         message,
+        conversation_id: conversationId,
+        conversation_updated_at: conversationUpdatedAt,
         conversation_history: conversationHistory,
         language,
         current_url: currentUrl,
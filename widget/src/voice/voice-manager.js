@@ -15,6 +15,7 @@ export class VoiceManager {
     this.onTranscript = null;
     this.onResponse = null;
     this.conversationHistory = null; // shared reference, set by WidgetCore
+    this.session = null; // shared reference, set by WidgetCore
     this.mediaRecorder = null;
     this.audioChunks = [];
     this.stream = null;
@@ -159,14 +160,19 @@ export class VoiceManager {
 
       if (this.onTranscript) this.onTranscript(transcript);
 
-      const history = this.conversationHistory || [];
+      // Once the server has persisted the conversation it no longer needs our copy
+      const history = this.session && this.session.persisted ? [] : this.conversationHistory || [];
       const language = result.language || 'auto';
 
+      const conversationId = this.session ? this.session.conversationId : null;
+      const updatedAt = this.session ? this.session.updatedAt : null;
       const chatResult = await this.apiClient.chat(
         transcript,
         history.slice(-10),
         language,
-        window.location.pathname
+        window.location.pathname,
+        conversationId,
+        updatedAt
       );
 
       if (chatResult.language && chatResult.language !== 'auto') {
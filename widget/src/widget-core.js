@@ -10,6 +10,8 @@ export class WidgetCore {
     this.config = config;
     this.apiBase = apiBase;
     this.conversationHistory = [];
+    // Server-side conversation; history is sent only until the server reports it persisted
+    this.session = { conversationId: null, persisted: false, updatedAt: null };
     this.language = 'auto';
     this.isOpen = false;
     this.greetingShown = false;
@@ -36,6 +38,7 @@ export class WidgetCore {
     this.voiceManager = new VoiceManager(this.apiKey, this.apiBase, this.config);
     // Share single conversation history with VoiceManager
     this.voiceManager.conversationHistory = this.conversationHistory;
+    this.voiceManager.session = this.session;
     this.voiceManager.onStateChange = (state) => this.chatUI.setVoiceState(state);
     this.voiceManager.onTranscript = (text) => {
       this.chatUI.addMessage('user', text);
@@ -44,6 +47,11 @@ export class WidgetCore {
     this.voiceManager.onResponse = (result) => {
       this.chatUI.addMessage('assistant', result.text);
       this.conversationHistory.push({ role: 'assistant', content: result.text });
+      if (result.conversation_id) {
+        this.session.conversationId = result.conversation_id;
+        this.session.persisted = !!result.persisted;
+        this.session.updatedAt = result.conversation_updated_at || null;
+      }
       if (result.language && result.language !== 'auto') {
         this.language = result.language;
         this.config._currentLanguage = result.language;
@@ -131,7 +139,9 @@ export class WidgetCore {
         },
         body: JSON.stringify({
           message: text,
-          conversation_history: this.conversationHistory.slice(-10),
+          conversation_id: this.session.conversationId,
+          conversation_updated_at: this.session.updatedAt,
+          conversation_history: this.session.persisted ? [] : this.conversationHistory.slice(-10),
           language: this.language,
           current_url: window.location.pathname,
         }),
@@ -140,6 +150,11 @@ export class WidgetCore {
       const result = await response.json();
       this.chatUI.addMessage('assistant', result.text);
       this.conversationHistory.push({ role: 'assistant', content: result.text });
+      if (result.conversation_id) {
+        this.session.conversationId = result.conversation_id;
+        this.session.persisted = !!result.persisted;
+        this.session.updatedAt = result.conversation_updated_at || null;
+      }
 
       if (result.language && result.language !== 'auto') {
         this.language = result.language;